@@ -1,33 +1,128 @@
 """
 authentication.py
 
-Defines a custom JWT authentication class that retrieves the access token
-from HTTP-only cookies instead of the Authorization header.
+Defines the JWT authentication class used by all API views. It reads the
+access token from the HTTP-only cookie, falling back to the Authorization
+header, and avoids a database query per request where it safely can.
 
 Classes:
+    - UserCache: Short-lived in-process cache of authenticated users keyed by
+      user id and token jti.
     - CookieJWTAuthentication: Extends rest_framework_simplejwt.authentication.JWTAuthentication
-      to authenticate users using the 'access_token' cookie.
+      to authenticate users using the 'access_token' cookie or the Authorization header.
 """
 
-from rest_framework_simplejwt.authentication import JWTAuthentication
+import threading
+import time
+from django.conf import settings
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+class UserCache:
+    """
+    Per-process cache of users resolved from access tokens.
+
+    Entries live for AUTH_USER_CACHE_SECONDS and are keyed by user id and the
+    token's jti, so a new token always starts with a fresh lookup. Saving or
+    deleting a user (password change, deactivation) drops its entries in this
+    process; other processes pick up the change within the TTL.
+    """
+
+    MAX_ENTRIES = 10000
+
+    _entries = {}
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def get(cls, validated_token, load):
+        """Return the cached user for a token, or call load(token) and cache the result."""
+
+        ttl = settings.AUTH_USER_CACHE_SECONDS
+        if not ttl:
+            return load(validated_token)
+
+        key = (str(validated_token[jwt_settings.USER_ID_CLAIM]), validated_token.get(jwt_settings.JTI_CLAIM))
+        now = time.monotonic()
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is not None and entry[0] > now:
+                cls._stats["hits"] += 1
+                return entry[1]
+            cls._stats["misses"] += 1
+
+        user = load(validated_token)
+        with cls._lock:
+            if len(cls._entries) >= cls.MAX_ENTRIES:
+                cls._entries = {k: v for k, v in cls._entries.items() if v[0] > now}
+                if len(cls._entries) >= cls.MAX_ENTRIES:
+                    cls._entries.clear()
+            cls._entries[key] = (now + ttl, user)
+        return user
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """Drop all cached entries of a user."""
+
+        with cls._lock:
+            for key in [k for k in cls._entries if k[0] == str(user_id)]:
+                del cls._entries[key]
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {**cls._stats, "entries": len(cls._entries)}
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls._stats.update(hits=0, misses=0)
+
 
 class CookieJWTAuthentication(JWTAuthentication):
-    """Authenticate users using the JWT access token stored in cookies."""
+    """
+    Authenticate users with the JWT access token from the 'access_token' cookie,
+    or from the Authorization header when no cookie is sent.
+
+    The token is validated once per request. The user comes from UserCache;
+    views that set `token_claims_user = True` get a TokenUser built from the
+    token claims instead (no query at all) for safe methods when
+    AUTH_TOKEN_CLAIMS_USER is enabled.
+    """
 
     def authenticate(self, request):
-        """Return (user, token) from the 'access_token' cookie or None."""
+        """Return (user, token) from the cookie or Authorization header, or None."""
 
         raw_token = request.COOKIES.get("access_token")
 
         if raw_token is None:
-            return None
+            header = self.get_header(request)
+            if header is None:
+                return None
+            raw_token = self.get_raw_token(header)
+            if raw_token is None:
+                return None
 
         try:
             validated_token = self.get_validated_token(raw_token)
         except (InvalidToken, TokenError):
             raise AuthenticationFailed("Invalid or expired access token")
 
-        user = self.get_user(validated_token)
+        if self.use_token_claims(request):
+            return TokenUser(validated_token), validated_token
+
+        user = UserCache.get(validated_token, self.get_user)
         return user, validated_token
+
+    @staticmethod
+    def use_token_claims(request) -> bool:
+        if not settings.AUTH_TOKEN_CLAIMS_USER or request.method not in SAFE_METHODS:
+            return False
+        view = getattr(request, "parser_context", {}).get("view")
+        return getattr(view, "token_claims_user", False)
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from django.contrib.auth.models import User
-from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from django.contrib.auth.models import User, update_last_login
+from django.contrib.auth import authenticate, get_user_model
 from rest_framework.exceptions import AuthenticationFailed
 
 User = get_user_model()
@@ -50,21 +51,19 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Obtain JWT token pair (access and refresh) after validating credentials."""
 
     def validate(self, attrs):
-        username = attrs.get("username")
-        password = attrs.get("password")
+        """Verify the password exactly once and return the token pair."""
 
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
+        user = authenticate(
+            self.context.get("request"),
+            username=attrs.get("username"),
+            password=attrs.get("password"),
+        )
+        if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
             raise AuthenticationFailed("Invalid username or password")
 
-        if not user.check_password(password):
-            raise AuthenticationFailed("Invalid username or password")
-
-        data = super().validate({
-            "username": user.username,
-            "password": password
-        })
+        refresh = self.get_token(user)
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
 
         self.user = user
-        return data
\ No newline at end of file
+        return {"refresh": str(refresh), "access": str(refresh.access_token)}
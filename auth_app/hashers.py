@@ -0,0 +1,25 @@
+"""
+hashers.py
+
+Password hasher with a configurable work factor.
+
+Classes:
+    - ConfigurablePBKDF2PasswordHasher: Django's PBKDF2-SHA256 hasher with the
+      iteration count taken from PASSWORD_PBKDF2_ITERATIONS and optional
+      upgrade of older hashes on login (PASSWORD_REHASH_ON_LOGIN).
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 whose iterations come from settings; hashes stay compatible with Django's."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or PBKDF2PasswordHasher.iterations
+
+    def must_update(self, encoded):
+        # Rehashing writes the user row during login; allow turning it off during login storms.
+        return settings.PASSWORD_REHASH_ON_LOGIN and super().must_update(encoded)
@@ -0,0 +1,11 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .api.authentication import UserCache
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Forget cached authentications after a password change, deactivation or deletion."""
+
+    UserCache.invalidate(instance.pk)
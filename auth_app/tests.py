@@ -1,7 +1,12 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from unittest.mock import patch
+from auth_app.api.authentication import UserCache
+from auth_app.hashers import ConfigurablePBKDF2PasswordHasher
 
 User = get_user_model()
 
@@ -70,6 +75,42 @@ class LoginTests(TestCase):
         })
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_login_hashes_password_once(self):
+        """A login runs the password hash exactly once."""
+        verify = ConfigurablePBKDF2PasswordHasher.verify
+        with patch.object(ConfigurablePBKDF2PasswordHasher, "verify", autospec=True, side_effect=verify) as mocked:
+            response = self.client.post("/api/login/", {"username": "loginuser", "password": "pass123"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mocked.call_count, 1)
+
+    def test_login_inactive_user_rejected(self):
+        """Inactive users cannot log in even with the right password."""
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post("/api/login/", {"username": "loginuser", "password": "pass123"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_rehashes_with_new_iterations(self):
+        """Logging in upgrades a hash made with an older iteration count."""
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user.set_password("pass123")
+            self.user.save()
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.client.post("/api/login/", {"username": "loginuser", "password": "pass123"})
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+    def test_login_rehash_can_be_disabled(self):
+        """With PASSWORD_REHASH_ON_LOGIN off the stored hash is left alone."""
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user.set_password("pass123")
+            self.user.save()
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000, PASSWORD_REHASH_ON_LOGIN=False):
+            response = self.client.post("/api/login/", {"username": "loginuser", "password": "pass123"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
 
 class TokenRefreshTests(TestCase):
     """Test JWT token refresh endpoint using cookies."""
@@ -108,3 +149,51 @@ class LogoutTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.cookies.get("access_token").value, "")
         self.assertEqual(response.cookies.get("refresh_token").value, "")
+
+
+class TokenAuthenticationTests(TestCase):
+    """Test JWT authentication from cookie or header with the cached user lookup."""
+
+    def setUp(self):
+        UserCache.clear()
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="authuser", password="pass123")
+        self.token = str(AccessToken.for_user(self.user))
+        self.client.cookies["access_token"] = self.token
+
+    def test_header_token_accepted(self):
+        """Clients without cookies can send the token in the Authorization header."""
+        self.client.cookies.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.assertEqual(self.client.get("/api/quizzes/").status_code, status.HTTP_200_OK)
+
+    def test_invalid_token_rejected(self):
+        """A bad cookie token is rejected without trying other sources."""
+        self.client.cookies["access_token"] = "not-a-token"
+        self.assertEqual(self.client.get("/api/quizzes/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(QUIZ_RESPONSE_CACHE_SECONDS=300)
+    def test_user_lookup_cached_per_token(self):
+        """Repeated requests with the same token do not query the user again."""
+        self.client.get("/api/quizzes/")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/quizzes/").status_code, status.HTTP_200_OK)
+        self.assertEqual(UserCache.stats()["hits"], 1)
+
+    def test_deactivation_invalidates_cache(self):
+        """Deactivated users are rejected on their next request."""
+        self.client.get("/api/quizzes/")
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/quizzes/").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CLAIMS_USER=True)
+    def test_token_claims_user_for_reads(self):
+        """Opted-in read endpoints trust the token claims; writes still load the user."""
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/quizzes/").status_code, status.HTTP_200_OK)
+        self.assertEqual(UserCache.stats()["misses"], 0)
+
+        self.client.post("/api/createQuiz/", {"url": "https://example.com/not-youtube"})
+        self.assertEqual(UserCache.stats()["misses"], 1)
@@ -0,0 +1,103 @@
+"""
+bench_login.py
+
+Measures login throughput of CustomTokenObtainPairSerializer (one password
+hash per login) against the previous flow, which ran check_password and then
+authenticate() again (two hashes per login). Each PBKDF2 iteration count is
+measured sequentially and with concurrent threads; hashlib releases the GIL
+while hashing, so the threaded numbers show how many cores a login storm keeps
+busy.
+
+Usage:
+    python benchmarks/bench_login.py --logins 20 --threads 4 --iterations 1000000 600000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+from django.conf import settings  # noqa: E402
+
+
+def setup_database(path):
+    # A file rather than ":memory:" so the worker threads see the same database.
+    settings.DATABASES["default"]["NAME"] = path
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+
+
+def legacy_login(username, password):
+    """The old flow: explicit check_password followed by authenticate() in super().validate."""
+
+    from django.contrib.auth import authenticate, get_user_model
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user = get_user_model().objects.get(username=username)
+    if not user.check_password(password):
+        raise ValueError("invalid credentials")
+    user = authenticate(username=username, password=password)
+    refresh = RefreshToken.for_user(user)
+    return str(refresh), str(refresh.access_token)
+
+
+def current_login(username, password):
+    from auth_app.api.serializers import CustomTokenObtainPairSerializer
+
+    serializer = CustomTokenObtainPairSerializer(data={"username": username, "password": password})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def measure(fn, logins, threads):
+    """Return logins per second for `logins` calls spread over `threads` threads."""
+
+    started = time.perf_counter()
+    if threads == 1:
+        for _ in range(logins):
+            fn("bench", "bench-password")
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda _: fn("bench", "bench-password"), range(logins)))
+    return logins / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--iterations", type=int, nargs="+", default=[1_000_000, 600_000])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-login-")
+    setup_database(os.path.join(workdir, "db.sqlite3"))
+    settings.PASSWORD_REHASH_ON_LOGIN = False
+
+    from django.contrib.auth import get_user_model
+    user = get_user_model().objects.create(username="bench")
+
+    print(f"{'iterations':>10} {'threads':>7} {'legacy/s':>9} {'current/s':>10} {'speedup':>8}")
+    for iterations in args.iterations:
+        settings.PASSWORD_PBKDF2_ITERATIONS = iterations
+        user.set_password("bench-password")
+        user.save()
+        for threads in sorted({1, args.threads}):
+            legacy = measure(legacy_login, args.logins, threads)
+            current = measure(current_login, args.logins, threads)
+            print(f"{iterations:10} {threads:7} {legacy:9.1f} {current:10.1f} {current / legacy:7.1f}x")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+bench_queries.py
+
+Seeds a throwaway SQLite database with quizzes and questions and reports
+list/detail/dedupe query latencies with the access-pattern indexes dropped
+and then restored.
+
+Usage:
+    python benchmarks/bench_queries.py --questions 1000000 --users 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+from django.conf import settings  # noqa: E402
+
+
+def setup_database(path):
+    settings.DATABASES["default"]["NAME"] = path
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+
+
+def seed(total_questions, users, batch=5000):
+    from django.contrib.auth import get_user_model
+    from quiz_app.models import Quiz, Question
+
+    User = get_user_model()
+    if Question.objects.count() >= total_questions:
+        return
+
+    accounts = User.objects.bulk_create(
+        User(username=f"bench{i}", password="!") for i in range(users))
+
+    quizzes_total = total_questions // 10
+    for start in range(0, quizzes_total, batch):
+        quizzes = Quiz.objects.bulk_create(
+            Quiz(user=random.choice(accounts), title=f"Quiz {n}",
+                 video_url=f"https://www.youtube.com/watch?v=v{n}")
+            for n in range(start, min(start + batch, quizzes_total)))
+        Question.objects.bulk_create(
+            Question(quiz=quiz, question_title=f"Question {i} of quiz {quiz.pk}?",
+                     question_options=["A", "B", "C", "D"], answer="A")
+            for quiz in quizzes for i in range(10))
+        print(f"  seeded {min(start + batch, quizzes_total) * 10:,} questions", end="\r")
+    print()
+
+
+def measure(repeats):
+    from django.contrib.auth import get_user_model
+    from quiz_app.models import Quiz
+
+    user_ids = list(get_user_model().objects.values_list("id", flat=True))
+    max_quiz = Quiz.objects.order_by("-id").values_list("id", flat=True).first()
+
+    def timed(fn):
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+    return {
+        "list (20 newest + questions)": timed(lambda: list(
+            Quiz.objects.filter(user_id=random.choice(user_ids))
+            .order_by("-created_at", "-id").prefetch_related("questions")[:20])),
+        "detail (quiz + questions)": timed(lambda: list(
+            Quiz.objects.filter(pk=random.randint(1, max_quiz)).prefetch_related("questions"))),
+        "dedupe by video_url": timed(lambda: Quiz.objects.filter(
+            video_url=f"https://www.youtube.com/watch?v=v{random.randint(1, max_quiz)}").exists()),
+    }
+
+
+def toggle_indexes(add):
+    from django.db import connection
+    from quiz_app.models import Quiz, Question
+
+    with connection.schema_editor() as editor:
+        for model in (Quiz, Question):
+            for index in model._meta.indexes:
+                if add:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(__file__), "bench_queries.sqlite3"))
+    args = parser.parse_args()
+
+    setup_database(args.db)
+    seed(args.questions, args.users)
+
+    toggle_indexes(add=False)
+    before = measure(args.repeats)
+    toggle_indexes(add=True)
+    after = measure(args.repeats)
+
+    print(f"{'query':32} {'before p50/p95 ms':>20} {'after p50/p95 ms':>20}")
+    for name in before:
+        b, a = before[name], after[name]
+        print(f"{name:32} {b[0]:9.2f} / {b[1]:8.2f} {a[0]:9.2f} / {a[1]:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+bench_serialization.py
+
+Compares quiz list serialization through the DRF ModelSerializers
+(QuizSerializer with prefetched questions) against the QuizReadSerializer
+fast path built from `.values()` rows, for 1, 100 and 1000 quizzes with ten
+questions each. Timings include the database queries and JSON rendering.
+
+Usage:
+    python benchmarks/bench_serialization.py --repeats 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+from django.conf import settings  # noqa: E402
+
+
+def setup_database():
+    settings.DATABASES["default"]["NAME"] = ":memory:"
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+
+
+def seed(quizzes):
+    from django.contrib.auth import get_user_model
+    from quiz_app.models import Quiz, Question
+
+    user = get_user_model().objects.create(username="bench", password="!")
+    created = Quiz.objects.bulk_create(
+        Quiz(user=user, title=f"Quiz {n}", description="Benchmark quiz",
+             video_url=f"https://www.youtube.com/watch?v=v{n}")
+        for n in range(quizzes))
+    Question.objects.bulk_create(
+        Question(quiz=quiz, question_title=f"Question {i} of quiz {quiz.pk}?",
+                 question_options=["Option A", "Option B", "Option C", "Option D"], answer="Option A")
+        for quiz in created for i in range(10))
+    return user
+
+
+def measure(user, count, repeats):
+    from rest_framework.renderers import JSONRenderer
+    from quiz_app.api.serializers import QuizSerializer, QuizReadSerializer
+    from quiz_app.models import Quiz
+
+    renderer = JSONRenderer()
+    base = Quiz.objects.filter(user=user).order_by("-created_at", "-id")
+
+    def drf():
+        return renderer.render(QuizSerializer(base.prefetch_related("questions")[:count], many=True).data)
+
+    def fast():
+        return renderer.render(QuizReadSerializer.many(base.values(*QuizReadSerializer.QUIZ_FIELDS)[:count]))
+
+    assert drf() == fast(), "fast path output differs"
+
+    results = {}
+    for name, fn in (("drf", drf), ("fast", fast)):
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+        results[name] = statistics.median(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_database()
+    user = seed(1000)
+
+    print(f"{'quizzes':>8} {'drf ms':>9} {'fast ms':>9} {'drf q/s':>10} {'fast q/s':>10} {'speedup':>8}")
+    for count in (1, 100, 1000):
+        r = measure(user, count, args.repeats)
+        print(f"{count:8} {r['drf'] * 1000:9.2f} {r['fast'] * 1000:9.2f} "
+              f"{count / r['drf']:10.0f} {count / r['fast']:10.0f} {r['drf'] / r['fast']:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+bench_startup.py
+
+Compares process startup with the heavy ML/LLM dependencies loaded lazily
+(current behaviour) against loading them eagerly at import, as the services
+used to. Reports wall time and peak RSS for `manage.py check` and for a web
+worker boot (WSGI application plus URLconf import).
+
+Usage:
+    python benchmarks/bench_startup.py --repeats 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["whisper", "yt_dlp", "google.genai"]
+
+# Runs in a child process and prints "<seconds> <peak rss kb> <loaded heavy modules>".
+CHILD = """
+import importlib, os, resource, sys, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+started = time.perf_counter()
+for name in {eager!r}:
+    importlib.import_module(name)
+{body}
+elapsed = time.perf_counter() - started
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, ",".join(loaded) or "-")
+"""
+
+SCENARIOS = {
+    "manage.py check": (
+        "from django.core.management import execute_from_command_line\n"
+        "execute_from_command_line(['manage.py', 'check', '-v', '0'])"
+    ),
+    "worker boot": (
+        "from core.wsgi import application\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns"
+    ),
+}
+
+
+def run(body, eager):
+    code = CHILD.format(eager=HEAVY_MODULES if eager else [], body=body, heavy=HEAVY_MODULES)
+    env = {**os.environ, "GOOGLE_GENAI_API_KEY": os.environ.get("GOOGLE_GENAI_API_KEY", "bench")}
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout.split()[-3:]
+    return float(out[0]), int(out[1]) / 1024, out[2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scenario':18} {'mode':6} {'median s':>9} {'peak MB':>8}  heavy modules loaded")
+    for name, body in SCENARIOS.items():
+        for mode, eager in (("eager", True), ("lazy", False)):
+            samples = [run(body, eager) for _ in range(args.repeats)]
+            seconds = statistics.median(s[0] for s in samples)
+            rss = statistics.median(s[1] for s in samples)
+            print(f"{name:18} {mode:6} {seconds:9.2f} {rss:8.0f}  {samples[-1][2]}")
+
+
+if __name__ == "__main__":
+    main()
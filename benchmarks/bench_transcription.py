@@ -0,0 +1,57 @@
+"""
+bench_transcription.py
+
+Compares a single serial Whisper pass against chunked parallel transcription
+for different worker counts and reports wall-clock speedup.
+
+Usage:
+    python benchmarks/bench_transcription.py lecture.m4a --workers 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from quiz_app.services.audio import SAMPLE_RATE, decode_audio  # noqa: E402
+from quiz_app.services.chunked_transcription import ChunkedTranscriber, split_audio  # noqa: E402
+from quiz_app.services.transcription import WhisperModelRegistry  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", help="Audio or video file readable by ffmpeg.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    pcm = decode_audio(args.audio)
+    chunks = len(split_audio(pcm, settings.WHISPER_CHUNK_SECONDS, settings.WHISPER_CHUNK_OVERLAP_SECONDS))
+    print(f"audio: {len(pcm) / SAMPLE_RATE:.0f}s, {chunks} chunks of {settings.WHISPER_CHUNK_SECONDS}s")
+
+    model = WhisperModelRegistry.get()
+    started = time.perf_counter()
+    model.transcribe(pcm)
+    baseline = time.perf_counter() - started
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    print(f"{'serial':>8} {baseline:9.1f} {1.0:8.2f}")
+
+    for workers in args.workers:
+        # Warm-up: spawns the pool and loads the model in every worker.
+        ChunkedTranscriber.transcribe(
+            pcm[:workers * settings.WHISPER_CHUNK_SECONDS * SAMPLE_RATE], workers=workers)
+        started = time.perf_counter()
+        ChunkedTranscriber.transcribe(pcm, workers=workers)
+        elapsed = time.perf_counter() - started
+        print(f"{workers:>8} {elapsed:9.1f} {baseline / elapsed:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -109,6 +109,18 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# PBKDF2 work factor (0 = Django's default) and whether logins upgrade older hashes
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", "0"))
+PASSWORD_REHASH_ON_LOGIN = os.environ.get("PASSWORD_REHASH_ON_LOGIN", "True") == "True"
+
+PASSWORD_HASHERS = [
+    "auth_app.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -148,15 +160,133 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
+    # Reads the access token from the cookie or the Authorization header
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'auth_app.api.authentication.CookieJWTAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
 }
 
+# Authenticated users are cached in-process per user id + token jti (0 disables)
+AUTH_USER_CACHE_SECONDS = int(os.environ.get("AUTH_USER_CACHE_SECONDS", "60"))
+# Serve read-only requests on opted-in views with a user built from the token claims (no DB lookup)
+AUTH_TOKEN_CLAIMS_USER = os.environ.get("AUTH_TOKEN_CLAIMS_USER", "False") == "True"
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
 GOOGLE_GENAI_API_KEY = os.environ.get("GOOGLE_GENAI_API_KEY")
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get("GEMINI_TIMEOUT_SECONDS", "60"))
+# Ask Gemini for schema-constrained JSON instead of free text
+GEMINI_STRUCTURED_OUTPUT = os.environ.get("GEMINI_STRUCTURED_OUTPUT", "True") == "True"
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_TIMEOUT_SECONDS = float(os.environ.get("OPENAI_TIMEOUT_SECONDS", "60"))
+# Simulated latency of the offline "fake" backend, for load tests
+FAKE_LLM_LATENCY_SECONDS = float(os.environ.get("FAKE_LLM_LATENCY_SECONDS", "0"))
+
+# Quiz generation backends tried in order: gemini, openai, fake
+QUIZ_LLM_BACKENDS = [b.strip() for b in os.environ.get("QUIZ_LLM_BACKENDS", "gemini").split(",") if b.strip()]
+# Transcripts longer than this many tokens go to QUIZ_LLM_LONG_PROMPT_BACKEND first
+QUIZ_LLM_LONG_PROMPT_BACKEND = os.environ.get("QUIZ_LLM_LONG_PROMPT_BACKEND", "")
+QUIZ_LLM_LONG_PROMPT_TOKENS = int(os.environ.get("QUIZ_LLM_LONG_PROMPT_TOKENS", "6000"))
+# Backends whose p95 latency exceeds this are tried last (0 disables)
+QUIZ_LLM_SLOW_P95_MS = int(os.environ.get("QUIZ_LLM_SLOW_P95_MS", "0"))
+LLM_MAX_ATTEMPTS = int(os.environ.get("LLM_MAX_ATTEMPTS", "5"))
+LLM_BACKOFF_BASE_SECONDS = float(os.environ.get("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.environ.get("LLM_BACKOFF_MAX_SECONDS", "20"))
+# Consecutive upstream failures before a backend fails fast, and for how long
+LLM_CIRCUIT_FAILURES = int(os.environ.get("LLM_CIRCUIT_FAILURES", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.environ.get("LLM_CIRCUIT_RESET_SECONDS", "60"))
+
+# Whisper transcription
+WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "tiny")
+WHISPER_DEVICE = os.environ.get("WHISPER_DEVICE") or None
+WHISPER_PRELOAD = os.environ.get("WHISPER_PRELOAD", "False") == "True"
+
+# Per-job scratch directories for downloaded audio (defaults to <tmp>/quizly-scratch).
+# New jobs get 503 while files on disk plus the expected download exceed the quota (0 disables).
+SCRATCH_DIR = os.environ.get("SCRATCH_DIR")
+SCRATCH_QUOTA_BYTES = int(os.environ.get("SCRATCH_QUOTA_BYTES", "2000000000"))
+SCRATCH_RETRY_AFTER_SECONDS = int(os.environ.get("SCRATCH_RETRY_AFTER_SECONDS", "30"))
+# Leftovers older than this are removed by the reap_scratch command
+SCRATCH_MAX_AGE_SECONDS = int(os.environ.get("SCRATCH_MAX_AGE_SECONDS", "21600"))
+
+# Standalone transcription worker(s) (run_transcription_worker), e.g. "127.0.0.1:8765"
+# or a Unix socket path; comma-separate several. Empty transcribes in-process.
+TRANSCRIPTION_WORKER_ADDRESS = os.environ.get("TRANSCRIPTION_WORKER_ADDRESS", "")
+TRANSCRIPTION_WORKER_AUTHKEY = os.environ.get("TRANSCRIPTION_WORKER_AUTHKEY", "")  # defaults to SECRET_KEY
+TRANSCRIPTION_WORKER_TIMEOUT_SECONDS = float(os.environ.get("TRANSCRIPTION_WORKER_TIMEOUT_SECONDS", "1800"))
+
+# Shared cache (response cache, probe cache). Use a file or Redis backend when
+# several processes need to see the same entries.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", "quizly"),
+    }
+}
+# How long serialized quiz detail/list responses are cached (writes invalidate earlier).
+# Writes invalidate only the cache of the writing process, so this is off (0) unless the
+# cache backend is shared; with it off responses still carry an ETag for conditional GETs.
+_PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache", "django.core.cache.backends.dummy.DummyCache")
+QUIZ_RESPONSE_CACHE_SECONDS = int(
+    os.environ.get("QUIZ_RESPONSE_CACHE_SECONDS") or (0 if CACHES["default"]["BACKEND"] in _PROCESS_LOCAL_CACHES else 300))
+
+# Quiz generation jobs: "thread", "db" (process_quiz_jobs command) or "eager"
+QUIZ_JOBS_MODE = os.environ.get("QUIZ_JOBS_MODE", "thread")
+QUIZ_JOB_WORKERS = int(os.environ.get("QUIZ_JOB_WORKERS", "2"))
+# Recovery of jobs orphaned by restarts: running jobs without progress for the timeout fail,
+# queued jobs older than the requeue age are resubmitted (thread mode)
+QUIZ_JOB_TIMEOUT_SECONDS = int(os.environ.get("QUIZ_JOB_TIMEOUT_SECONDS", "3600"))
+QUIZ_JOB_REQUEUE_SECONDS = int(os.environ.get("QUIZ_JOB_REQUEUE_SECONDS", "300"))
+QUIZ_JOB_RECOVERY_INTERVAL_SECONDS = int(os.environ.get("QUIZ_JOB_RECOVERY_INTERVAL_SECONDS", "60"))
+
+# Token-bucket rate limits per endpoint scope ("<requests>/<second|minute|hour|day>", empty disables);
+# the burst is the bucket size, i.e. how many requests may arrive at once (0 = the request count)
+QUIZ_THROTTLE_RATES = {
+    "quiz_create": os.environ.get("QUIZ_CREATE_THROTTLE_RATE", "30/hour"),
+    "quiz_read": os.environ.get("QUIZ_READ_THROTTLE_RATE", ""),
+}
+QUIZ_THROTTLE_BURSTS = {
+    "quiz_create": int(os.environ.get("QUIZ_CREATE_THROTTLE_BURST", "5")),
+    "quiz_read": int(os.environ.get("QUIZ_READ_THROTTLE_BURST", "0")),
+}
+# Active (pending/running) job caps per user and overall (0 disables a cap); beyond them creation gets 429
+QUIZ_MAX_ACTIVE_JOBS_PER_USER = int(os.environ.get("QUIZ_MAX_ACTIVE_JOBS_PER_USER", "2"))
+QUIZ_MAX_ACTIVE_JOBS = int(os.environ.get("QUIZ_MAX_ACTIVE_JOBS", "20"))
+QUIZ_QUOTA_RETRY_AFTER_SECONDS = int(os.environ.get("QUIZ_QUOTA_RETRY_AFTER_SECONDS", "30"))
+# Jobs without progress for this long are considered abandoned and no longer count as active
+QUIZ_ACTIVE_JOB_MAX_AGE_SECONDS = int(os.environ.get("QUIZ_ACTIVE_JOB_MAX_AGE_SECONDS", "21600"))
+
+# Transcript cache (shared across users, keyed by video id + Whisper model)
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.environ.get("TRANSCRIPT_CACHE_MAX_ENTRIES", "1000"))
+TRANSCRIPT_CACHE_MAX_AGE_DAYS = int(os.environ.get("TRANSCRIPT_CACHE_MAX_AGE_DAYS", "30"))
+
+# Directory for cross-process single-flight lock files (defaults to the temp dir)
+SINGLE_FLIGHT_LOCK_DIR = os.environ.get("SINGLE_FLIGHT_LOCK_DIR")
+
+# How audio is fetched for transcription: "native", "stream" or legacy "mp3"
+YOUTUBE_AUDIO_MODE = os.environ.get("YOUTUBE_AUDIO_MODE", "native")
+
+# Chunked parallel transcription for long audio (0 disables chunking)
+WHISPER_CHUNK_MIN_SECONDS = int(os.environ.get("WHISPER_CHUNK_MIN_SECONDS", "600"))
+WHISPER_CHUNK_SECONDS = int(os.environ.get("WHISPER_CHUNK_SECONDS", "120"))
+WHISPER_CHUNK_OVERLAP_SECONDS = int(os.environ.get("WHISPER_CHUNK_OVERLAP_SECONDS", "2"))
+WHISPER_CHUNK_WORKERS = int(os.environ.get("WHISPER_CHUNK_WORKERS", "0"))  # 0 = all usable CPUs
+
+# Upper bound for transcript tokens sent to the LLM (0 disables condensation)
+QUIZ_TRANSCRIPT_TOKEN_BUDGET = int(os.environ.get("QUIZ_TRANSCRIPT_TOKEN_BUDGET", "8000"))
+
+# Pre-flight limits checked before any audio is downloaded (0 disables a limit)
+YOUTUBE_MAX_DURATION_SECONDS = int(os.environ.get("YOUTUBE_MAX_DURATION_SECONDS", "7200"))
+YOUTUBE_MAX_FILESIZE_BYTES = int(os.environ.get("YOUTUBE_MAX_FILESIZE_BYTES", "300000000"))
+YOUTUBE_PROBE_CACHE_SECONDS = int(os.environ.get("YOUTUBE_PROBE_CACHE_SECONDS", "3600"))
+# Videos longer than this run on a dedicated job worker so short ones are not stuck behind them
+QUIZ_LONG_VIDEO_SECONDS = int(os.environ.get("QUIZ_LONG_VIDEO_SECONDS", "1200"))
+
+# Threads used by the async create endpoint for blocking download/transcription work
+QUIZ_ASYNC_TRANSCRIPTION_WORKERS = int(os.environ.get("QUIZ_ASYNC_TRANSCRIPTION_WORKERS", "2"))
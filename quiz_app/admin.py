@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Quiz, Question
+from .models import Quiz, Question, QuizJob, Transcript
 
 
 class QuestionInline(admin.TabularInline):
@@ -31,4 +31,18 @@ class QuestionAdmin(admin.ModelAdmin):
     def get_readonly_fields(self, request, obj=None):
         if obj:  # Editing an existing object
             return ("quiz", "question_title", "question_options", "answer", "created_at", "updated_at")
-        return self.readonly_fields
\ No newline at end of file
+        return self.readonly_fields
+
+@admin.register(Transcript)
+class TranscriptAdmin(admin.ModelAdmin):
+    list_display = ("id", "video_id", "model_name", "title", "hits", "created_at", "last_used_at")
+    search_fields = ("video_id", "title")
+    list_filter = ("model_name",)
+    readonly_fields = ("created_at", "last_used_at", "hits")
+
+@admin.register(QuizJob)
+class QuizJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "status", "stage", "progress", "duration", "created_at", "updated_at")
+    search_fields = ("video_url", "user__username", "error")
+    list_filter = ("status", "stage")
+    readonly_fields = ("created_at", "updated_at", "metrics")
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import math
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class QuizResponseCache:
+    """Per-user cache of serialized quiz responses with ETag/Last-Modified validators.
+
+    Detail entries are keyed by user and quiz, list entries by user and query
+    string. Both include the user's cache generation, so invalidate() drops
+    every cached response of that user with a single cache write. The
+    generation is the time of the last invalidation and also serves as a
+    lower bound for Last-Modified, which keeps If-Modified-Since correct when
+    quizzes or questions are deleted.
+
+    With QUIZ_RESPONSE_CACHE_SECONDS=0 (the default with a per-process cache)
+    nothing is cached and responses carry only an ETag, which needs no shared
+    state to stay correct.
+    """
+
+    @staticmethod
+    def generation(user_id) -> float:
+        return cache.get_or_set(f"quiz-response:gen:{user_id}", time.time(), None)
+
+    @staticmethod
+    def invalidate(user_id):
+        cache.set(f"quiz-response:gen:{user_id}", time.time(), None)
+
+    @staticmethod
+    def detail_key(user_id, quiz_id) -> str:
+        return f"quiz-response:{user_id}:{QuizResponseCache.generation(user_id)}:detail:{quiz_id}"
+
+    @staticmethod
+    def list_key(user_id, query_params) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(query_params.items()))
+        return f"quiz-response:{user_id}:{QuizResponseCache.generation(user_id)}:list:{query}"
+
+    @staticmethod
+    def get(key):
+        return cache.get(key) if settings.QUIZ_RESPONSE_CACHE_SECONDS else None
+
+    @staticmethod
+    def store(key, data, user_id, updated_at=()) -> dict:
+        """Cache serialized data with its validators and return the entry."""
+
+        body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if not settings.QUIZ_RESPONSE_CACHE_SECONDS:
+            return {"data": data, "etag": etag, "last_modified": None}
+
+        timestamps = [dt.timestamp() for dt in updated_at] + [QuizResponseCache.generation(user_id)]
+        entry = {
+            "data": data,
+            "etag": etag,
+            "last_modified": math.ceil(max(timestamps)),
+        }
+        cache.set(key, entry, settings.QUIZ_RESPONSE_CACHE_SECONDS)
+        return entry
+
+    @staticmethod
+    def respond(request, entry) -> Response:
+        """Return 304 if the client's validators match the entry, else the cached body."""
+
+        headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache"}
+        if entry["last_modified"] is not None:
+            headers["Last-Modified"] = http_date(entry["last_modified"])
+        if QuizResponseCache.not_modified(request, entry):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry["data"], headers=headers)
+
+    @staticmethod
+    def not_modified(request, entry) -> bool:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or entry["etag"] in tags
+
+        if entry["last_modified"] is None:
+            return False
+        if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since"))
+        return if_modified_since is not None and entry["last_modified"] <= if_modified_since
@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class QuizCursorPagination(CursorPagination):
+    """
+    Cursor pagination over quizzes, newest first.
+
+    Pagination is opt-in: it only applies when the client sends `page_size`,
+    so requests without it keep receiving the plain list.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = None
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -7,4 +7,5 @@ class IsOwner(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        # Compare ids: avoids loading obj.user and also works for token-claims users.
+        return str(obj.user_id) == str(request.user.pk)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from quiz_app.models import Quiz, Question
+from quiz_app.models import Quiz, Question, QuizJob
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -20,3 +20,85 @@ class QuizSerializer(serializers.ModelSerializer):
         model = Quiz
         fields = ["id", "title", "description",
                   "created_at", "updated_at", "video_url", "questions"]
+
+
+class QuizSummarySerializer(serializers.ModelSerializer):
+    """Lightweight Quiz serializer without nested questions, for list views."""
+
+    class Meta:
+        model = Quiz
+        fields = ["id", "title", "description",
+                  "created_at", "updated_at", "video_url"]
+
+
+class QuizJobSerializer(serializers.ModelSerializer):
+    """Serializer for the status of a background quiz generation job."""
+
+    quiz = QuizSerializer(read_only=True)
+
+    class Meta:
+        model = QuizJob
+        fields = ["id", "status", "stage", "progress", "duration", "error", "metrics",
+                  "video_url", "quiz", "created_at", "updated_at"]
+
+
+class QuizReadSerializer:
+    """
+    Read-only fast path producing the same output as QuizSerializer.
+
+    Builds response dicts straight from `.values()` rows or prefetched
+    instances instead of running ModelSerializer fields per object.
+    QuizSerializer stays the write/validation path; the field lists and
+    their order here must match it (a test compares the rendered bytes).
+    """
+
+    QUIZ_FIELDS = ("id", "title", "description", "created_at", "updated_at", "video_url")
+    QUESTION_FIELDS = ("id", "question_title", "question_options", "answer")
+
+    @staticmethod
+    def many(rows, with_questions=True) -> list:
+        """Serialize quiz rows from `.values(*QUIZ_FIELDS)`, loading all questions in one query."""
+
+        rows = list(rows)
+        questions = {}
+        if with_questions and rows:
+            question_rows = (
+                Question.objects.filter(quiz_id__in=[row["id"] for row in rows])
+                .order_by("quiz_id", "id")
+                .values("quiz_id", *QuizReadSerializer.QUESTION_FIELDS)
+            )
+            for question in question_rows:
+                questions.setdefault(question.pop("quiz_id"), []).append(question)
+
+        to_datetime = serializers.DateTimeField().to_representation
+        return [
+            QuizReadSerializer._quiz(row, questions.get(row["id"], []) if with_questions else None, to_datetime)
+            for row in rows
+        ]
+
+    @staticmethod
+    def one(quiz, questions=None) -> dict:
+        """Serialize a Quiz instance; `questions` defaults to its (prefetched) questions."""
+
+        if questions is None:
+            questions = quiz.questions.all()
+        row = {field: getattr(quiz, field) for field in QuizReadSerializer.QUIZ_FIELDS}
+        questions = [
+            {field: getattr(q, field) for field in QuizReadSerializer.QUESTION_FIELDS}
+            for q in questions
+        ]
+        return QuizReadSerializer._quiz(row, questions, serializers.DateTimeField().to_representation)
+
+    @staticmethod
+    def _quiz(row, questions, to_datetime) -> dict:
+        data = {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "created_at": to_datetime(row["created_at"]),
+            "updated_at": to_datetime(row["updated_at"]),
+            "video_url": row["video_url"],
+        }
+        if questions is not None:
+            data["questions"] = questions
+        return data
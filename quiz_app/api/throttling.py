@@ -0,0 +1,62 @@
+import math
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Token-bucket rate limit per view scope, stored in the shared Django cache.
+
+    Views set `throttle_scope`; the rate comes from QUIZ_THROTTLE_RATES
+    ("<requests>/<second|minute|hour|day>", empty disables) and the bucket
+    holds QUIZ_THROTTLE_BURSTS tokens, so short bursts pass and sustained
+    traffic is held to the rate. Requests are keyed by user id, or by client
+    address when anonymous. With a shared cache (Redis, Memcached, database)
+    the limit applies across all processes; read-modify-write is not atomic,
+    so concurrent requests may overshoot by a token or two.
+    """
+
+    def __init__(self):
+        self.retry_after = None
+
+    def allow_request(self, request, view) -> bool:
+        scope = getattr(view, "throttle_scope", None)
+        user = getattr(request, "user", None)
+        ident = f"user:{user.pk}" if user and user.is_authenticated else f"ip:{self.get_ident(request)}"
+        allowed, self.retry_after = self.consume(scope, ident)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+    @staticmethod
+    def consume(scope, ident) -> tuple[bool, float | None]:
+        """Take one token from the bucket of scope/ident; returns (allowed, seconds until next token)."""
+
+        rate = settings.QUIZ_THROTTLE_RATES.get(scope) if scope else None
+        if not rate:
+            return True, None
+
+        per_second, count = parse_rate(rate)
+        capacity = settings.QUIZ_THROTTLE_BURSTS.get(scope) or count
+        key = f"throttle:{scope}:{ident}"
+        now = time.time()
+
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * per_second)
+        if tokens < 1:
+            return False, (1 - tokens) / per_second
+
+        # An untouched bucket refills completely, so the entry may expire then.
+        cache.set(key, (tokens - 1, now), math.ceil(capacity / per_second))
+        return True, None
+
+
+def parse_rate(rate: str) -> tuple[float, int]:
+    """Parse "10/min" into (tokens per second, request count)."""
+
+    count, period = rate.split("/")
+    return int(count) / PERIODS[period.strip()[0]], int(count)
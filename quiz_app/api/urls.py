@@ -1,10 +1,15 @@
 """URL routing for the quiz_app API endpoints."""
 
 from rest_framework.urls import path
-from .views import QuizViewDetail, CreateQuizView, QuizListView
+from .views import (
+    QuizViewDetail, CreateQuizView, AsyncCreateQuizView, QuizListView, QuizJobDetailView, PipelineMetricsView,
+)
 
 urlpatterns = [
     path('createQuiz/', CreateQuizView.as_view(), name="create-quiz"),
+    path('createQuiz/async/', AsyncCreateQuizView.as_view(), name="create-quiz-async"),
     path('quizzes/', QuizListView.as_view(), name="quiz-list"),
-    path('quizzes/<int:pk>/', QuizViewDetail.as_view(), name="quiz-detail")
+    path('quizzes/<int:pk>/', QuizViewDetail.as_view(), name="quiz-detail"),
+    path('jobs/<int:pk>/', QuizJobDetailView.as_view(), name="quiz-job-detail"),
+    path('metrics/pipeline/', PipelineMetricsView.as_view(), name="pipeline-metrics"),
 ]
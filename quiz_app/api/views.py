@@ -1,52 +1,251 @@
+import json
+import math
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status, permissions, generics
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .serializers import QuizSerializer
+from .serializers import QuizSerializer, QuizSummarySerializer, QuizJobSerializer, QuizReadSerializer
+from .pagination import QuizCursorPagination
+from .caching import QuizResponseCache
 from .permissions import IsOwner
-from quiz_app.models import Quiz
+from .throttling import TokenBucketThrottle
+from quiz_app.models import Quiz, QuizJob
+from quiz_app.services.jobs import QuizJobQueue
 from quiz_app.services.quiz_creator import QuizCreator
+from quiz_app.services.youtube import VideoRejectedError
+from quiz_app.services.scratch import ScratchSpace, ScratchSpaceFull
+from quiz_app.services.quotas import JobQuota, QuotaExceeded
+from quiz_app.services.llm_backends import backend_stats
+from quiz_app.services.gemini import QuizAssembly
+from quiz_app.services.transcript_cache import TranscriptCache
+from quiz_app.services.transcription import WhisperModelRegistry
+from quiz_app.services import tracing
+from quiz_app.utils import extract_video_id
 
 
 class QuizViewDetail(generics.RetrieveUpdateDestroyAPIView):
-    """Retrieve, update, or delete a single Quiz. Only the owner can access."""
+    """
+    Retrieve, update, or delete a single Quiz. Only the owner can access.
 
-    queryset = Quiz.objects.all()
+    Responses are cached per user and quiz and carry ETag/Last-Modified
+    headers; conditional requests are answered with 304. Writes invalidate
+    the cache through the Quiz/Question signals.
+    """
+
+    queryset = Quiz.objects.prefetch_related("questions")
     serializer_class = QuizSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "quiz_read"
+    token_claims_user = True
+
+    def retrieve(self, request, *args, **kwargs):
+        # Entries are only stored after the owner check passed for this user.
+        key = QuizResponseCache.detail_key(request.user.pk, kwargs["pk"])
+        entry = QuizResponseCache.get(key)
+        if entry is None:
+            quiz = self.get_object()
+            updated = [quiz.updated_at] + [q.updated_at for q in quiz.questions.all()]
+            entry = QuizResponseCache.store(key, QuizReadSerializer.one(quiz), request.user.pk, updated)
+        return QuizResponseCache.respond(request, entry)
+
 
+class QuizListView(generics.ListAPIView):
+    """
+    List all quizzes belonging to the authenticated user, newest first.
 
-class QuizListView(APIView):
-    """List all quizzes belonging to the authenticated user."""
+    Query parameters:
+        - page_size: enable cursor pagination with this many quizzes per page
+        - summary=true: omit the nested questions
+
+    Cached per user and query string, with the same validators as the detail view.
+    """
 
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = QuizCursorPagination
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "quiz_read"
+    token_claims_user = True
 
     def get_queryset(self):
-        return Quiz.objects.filter(user=self.request.user)
+        # Plain rows for the QuizReadSerializer fast path; questions are loaded in one extra query.
+        return (
+            Quiz.objects.filter(user_id=self.request.user.pk).order_by("-created_at", "-id")
+            .values(*QuizReadSerializer.QUIZ_FIELDS))
 
-    def get(self, request):
-        serializer = QuizSerializer(
-            self.get_queryset(), many=True, context={"request": request})
-        return Response(serializer.data)
+    def get_serializer_class(self):
+        # Describes the response shape; list() serializes through QuizReadSerializer.
+        return QuizSummarySerializer if self.is_summary() else QuizSerializer
+
+    def list(self, request, *args, **kwargs):
+        key = QuizResponseCache.list_key(request.user.pk, request.query_params)
+        entry = QuizResponseCache.get(key)
+        if entry is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            rows = list(page if page is not None else queryset)
+            data = QuizReadSerializer.many(rows, with_questions=not self.is_summary())
+            if page is not None:
+                data = self.get_paginated_response(data).data
+            entry = QuizResponseCache.store(key, data, request.user.pk, [row["updated_at"] for row in rows])
+        return QuizResponseCache.respond(request, entry)
+
+    def is_summary(self) -> bool:
+        return self.request.query_params.get("summary", "").lower() in ("1", "true", "yes")
 
 
 class CreateQuizView(APIView):
-    """Create a quiz from a YouTube video. Authenticated users only."""
+    """
+    Queue quiz creation from a YouTube video. Authenticated users only.
+
+    Rate limited per user (scope "quiz_create"); requests beyond the active
+    job quotas are answered with 429 and Retry-After.
+    """
 
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "quiz_create"
 
     def post(self, request):
 
         url = request.data.get("url")
         if not url:
             return Response({"error": "YouTube URL required"}, status=400)
+        if not extract_video_id(url):
+            return Response({"error": "Invalid YouTube URL"}, status=400)
+
+        try:
+            job = QuizJobQueue.enqueue(request.user, url)
+        except VideoRejectedError as e:
+            return Response({"error": str(e)}, status=400)
+        except QuotaExceeded as e:
+            return Response({"error": str(e)}, status=429, headers={"Retry-After": str(e.retry_after)})
+        except ScratchSpaceFull as e:
+            return Response({"error": str(e)}, status=503, headers={"Retry-After": str(e.retry_after)})
+
+        return Response(
+            QuizJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncCreateQuizView(View):
+    """
+    Create a quiz inline on an async (ASGI) worker and return it directly.
+
+    Unlike CreateQuizView no job is queued: the request awaits the pipeline,
+    with Gemini called through its async client and download/transcription
+    offloaded to a thread pool, so one event loop can serve many creations.
+    Uses the same JWT authentication, rate limit and job quotas as
+    CreateQuizView; a running inline creation counts as an active job.
+    """
+
+    http_method_names = ["post"]
+    throttle_scope = "quiz_create"
+
+    async def post(self, request):
+        try:
+            user = await sync_to_async(self.authenticate)(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({"detail": str(e.detail)}, status=401)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+        try:
+            url = json.loads(request.body or b"{}").get("url")
+        except (ValueError, AttributeError):
+            url = None
+        if not url:
+            return JsonResponse({"error": "YouTube URL required"}, status=400)
+        if not extract_video_id(url):
+            return JsonResponse({"error": "Invalid YouTube URL"}, status=400)
 
+        allowed, wait = await sync_to_async(TokenBucketThrottle.consume)(self.throttle_scope, f"user:{user.pk}")
+        if not allowed:
+            return JsonResponse(
+                {"detail": f"Request was throttled. Expected available in {math.ceil(wait)} seconds."},
+                status=429, headers={"Retry-After": str(math.ceil(wait))})
         try:
-            quiz = QuizCreator.create(request.user, url)
-            quiz.refresh_from_db()
-            return Response(
-                QuizSerializer(quiz, context={"request": request}).data,
-                status=status.HTTP_201_CREATED
-            )
-
-        except Exception as e:
-            return Response({"error": str(e)}, status=500)
+            await sync_to_async(JobQuota.admit)(user, inline=True)
+        except QuotaExceeded as e:
+            return JsonResponse({"error": str(e)}, status=429, headers={"Retry-After": str(e.retry_after)})
+
+        with tracing.trace() as pipeline:
+            try:
+                await QuizCreator.apreflight(url)
+                quiz, questions = await QuizCreator.acreate(user, url)
+            except VideoRejectedError as e:
+                return JsonResponse({"error": str(e)}, status=400)
+            except ScratchSpaceFull as e:
+                return JsonResponse({"error": str(e)}, status=503, headers={"Retry-After": str(e.retry_after)})
+            except Exception as e:
+                return JsonResponse(
+                    {"error": str(e), "stage": pipeline.failed_stage}, status=500,
+                    headers={"Server-Timing": self.server_timing(pipeline)})
+            finally:
+                JobQuota.release(user)
+
+        return JsonResponse(
+            QuizReadSerializer.one(quiz, questions), status=status.HTTP_201_CREATED, headers={"Server-Timing": self.server_timing(pipeline)})
+
+    @staticmethod
+    def server_timing(pipeline) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in pipeline.stages.items())
+
+    def authenticate(self, request):
+        """Return the user from the configured DRF authentication classes, or None."""
+
+        for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            result = authenticator().authenticate(request)
+            if result is not None and result[0].is_active:
+                return result[0]
+        return None
+
+
+class QuizJobDetailView(generics.RetrieveAPIView):
+    """Report stage and progress of a quiz generation job. Only the owner can access."""
+
+    serializer_class = QuizJobSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOwner]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "quiz_read"
+    token_claims_user = True
+
+    def get_queryset(self):
+        return QuizJob.objects.select_related("quiz").prefetch_related("quiz__questions")
+
+    def retrieve(self, request, *args, **kwargs):
+        # Polling clients are the first to notice orphaned jobs after a restart.
+        QuizJobQueue.maybe_recover()
+        return super().retrieve(request, *args, **kwargs)
+
+
+class PipelineMetricsView(APIView):
+    """Percentiles of per-stage pipeline timings and sizes across recent jobs. Admins only."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 500)), 1), 5000)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+
+        return Response({
+            **QuizJobQueue.pipeline_stats(limit),
+            "process": {
+                "llm_backends": backend_stats(),
+                "quiz_assembly": QuizAssembly.stats(),
+                "transcript_cache": TranscriptCache.stats(),
+                "whisper": WhisperModelRegistry.stats(),
+                "scratch": ScratchSpace.stats(),
+                "quotas": JobQuota.stats(),
+            },
+        })
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class QuizAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz_app'
+
+    def ready(self):
+        """Connect cache invalidation signals and pre-load Whisper when WHISPER_PRELOAD is enabled."""
+
+        from quiz_app import signals  # noqa: F401
+
+        if settings.WHISPER_PRELOAD:
+            from quiz_app.services.transcription import WhisperModelRegistry
+            WhisperModelRegistry.warm_up()
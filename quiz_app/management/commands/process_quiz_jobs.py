@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.core.management.base import BaseCommand
+from quiz_app.services.jobs import QuizJobQueue
+
+
+class Command(BaseCommand):
+    """Worker loop for the database-backed quiz job queue (QUIZ_JOBS_MODE=db)."""
+
+    help = "Claim and run pending quiz generation jobs from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Jobs to run concurrently.")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds between polls when idle.")
+        parser.add_argument("--once", action="store_true", help="Drain pending jobs and exit.")
+        parser.add_argument(
+            "--lane", choices=["short", "long"], default=None,
+            help="Only take jobs for videos up to / over QUIZ_LONG_VIDEO_SECONDS.")
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quiz-job") as pool:
+            running = {}
+            while True:
+                QuizJobQueue.maybe_recover()
+                claimed = self._claim_batch(workers - len(running), options["lane"])
+                for job_id in claimed:
+                    if workers == 1:
+                        self._report(self._execute_inline(job_id))
+                    else:
+                        running[pool.submit(self._execute, job_id)] = job_id
+
+                if running:
+                    # Refill a slot as soon as any job finishes, not when the whole batch is done.
+                    done, _ = wait(running, timeout=options["poll"], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del running[future]
+                        self._report(future.result())
+                    continue
+                if claimed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll"])
+
+    def _report(self, job_id):
+        self.stdout.write(f"Finished job {job_id}")
+
+    def _claim_batch(self, size, lane) -> list:
+        claimed = []
+        while len(claimed) < size:
+            job_id = QuizJobQueue.next_pending_id(lane)
+            if job_id is None:
+                break
+            if QuizJobQueue.claim(job_id):
+                claimed.append(job_id)
+        return claimed
+
+    def _execute_inline(self, job_id):
+        QuizJobQueue.execute(job_id)
+        return job_id
+
+    def _execute(self, job_id):
+        QuizJobQueue.run_in_worker(job_id, claimed=True)
+        return job_id
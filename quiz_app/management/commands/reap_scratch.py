@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from quiz_app.services.scratch import ScratchSpace
+
+
+class Command(BaseCommand):
+    """Remove download scratch space left behind by crashed or killed jobs."""
+
+    help = "Delete scratch directories older than SCRATCH_MAX_AGE_SECONDS."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age", type=float, default=None,
+            help="Seconds since last modification (defaults to SCRATCH_MAX_AGE_SECONDS).")
+        parser.add_argument(
+            "--legacy-temp-files", action="store_true",
+            help="Also delete <uuid>.mp3/m4a/webm/opus/part files in the system temp dir left by older versions.")
+
+    def handle(self, *args, **options):
+        removed, freed = ScratchSpace.reap(options["max_age"], legacy=options["legacy_temp_files"])
+        self.stdout.write(f"Removed {removed} entries, freed {freed / 1_000_000:.1f} MB")
+        stats = ScratchSpace.stats()
+        self.stdout.write(
+            f"In flight: {stats['bytes_in_flight'] / 1_000_000:.1f} MB "
+            f"of {stats['quota_bytes'] / 1_000_000:.0f} MB quota")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from quiz_app.services.jobs import QuizJobQueue
+
+
+class Command(BaseCommand):
+    """Clean up quiz jobs left behind by restarted or killed processes."""
+
+    help = "Fail timed-out running jobs and requeue orphaned pending jobs."
+
+    def handle(self, *args, **options):
+        result = QuizJobQueue.recover()
+        self.stdout.write(
+            f"Timed out {result['timed_out']}, abandoned {result['abandoned']}, requeued {result['requeued']} jobs")
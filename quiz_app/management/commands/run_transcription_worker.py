@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from quiz_app.services.transcription import WhisperModelRegistry
+from quiz_app.services.transcription_worker import TranscriptionWorker
+
+
+class Command(BaseCommand):
+    """Standalone Whisper process that web workers send transcriptions to."""
+
+    help = "Load Whisper once and serve transcription requests on a local socket."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--address", default=None,
+            help="host:port or Unix socket path (defaults to the first TRANSCRIPTION_WORKER_ADDRESS).")
+        parser.add_argument(
+            "--concurrency", type=int, default=1, help="Transcriptions to run at the same time.")
+        parser.add_argument("--no-preload", action="store_true", help="Load the model on first request.")
+
+    def handle(self, *args, **options):
+        address = options["address"] or settings.TRANSCRIPTION_WORKER_ADDRESS.split(",")[0].strip()
+        if not address:
+            raise CommandError("Pass --address or set TRANSCRIPTION_WORKER_ADDRESS.")
+
+        if not options["no_preload"]:
+            for name, seconds in WhisperModelRegistry.warm_up().items():
+                self.stdout.write(f"{name}: loaded in {seconds:.2f}s")
+
+        worker = TranscriptionWorker(address, options["concurrency"])
+        self.stdout.write(f"Transcription worker listening on {worker.address}")
+        try:
+            worker.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
+            self.stdout.write(f"Stopped after {worker.stats()}")
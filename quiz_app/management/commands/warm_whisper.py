@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from quiz_app.services.transcription import WhisperModelRegistry
+
+
+class Command(BaseCommand):
+    """Download and load Whisper models ahead of the first quiz request."""
+
+    help = "Download and load Whisper models so the first transcription skips the cold start."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model", action="append", dest="models",
+            help="Model name to warm up (repeatable, defaults to WHISPER_MODEL).")
+        parser.add_argument("--device", default=None, help="Torch device, e.g. cpu or cuda.")
+
+    def handle(self, *args, **options):
+        timings = WhisperModelRegistry.warm_up(options["models"], options["device"])
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name}: loaded in {seconds:.2f}s")
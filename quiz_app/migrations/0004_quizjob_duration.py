@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0003_transcript'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='duration',
+            field=models.PositiveIntegerField(blank=True, help_text='Video length in seconds from the pre-flight probe.', null=True),
+        ),
+    ]
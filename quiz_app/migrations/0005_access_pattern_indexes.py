@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0004_quizjob_duration'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['quiz', 'id'], name='question_quiz_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['user', '-created_at'], name='quiz_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['video_url'], name='quiz_video_url_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizjob',
+            index=models.Index(fields=['status', 'created_at'], name='quizjob_status_created_idx'),
+        ),
+    ]
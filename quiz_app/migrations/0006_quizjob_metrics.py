@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0005_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='metrics',
+            field=models.JSONField(blank=True, help_text='Per-stage durations, sizes and retry counts of the run.', null=True),
+        ),
+    ]
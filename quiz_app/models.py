@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 User = get_user_model()
 
 
@@ -19,6 +20,12 @@ class Quiz(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="quiz_user_created_idx"),
+            models.Index(fields=["video_url"], name="quiz_video_url_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -36,5 +43,78 @@ class Question(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["quiz", "id"], name="question_quiz_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.quiz.title} – {self.question_title}"
+
+
+class QuizJob(models.Model):
+
+    """Tracks the background generation of a quiz from a YouTube video."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="quiz_jobs"
+    )
+    video_url = models.URLField()
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING)
+    stage = models.CharField(max_length=32, default="queued")
+    progress = models.PositiveSmallIntegerField(default=0)
+    duration = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Video length in seconds from the pre-flight probe.")
+    error = models.TextField(blank=True)
+    metrics = models.JSONField(
+        null=True, blank=True, help_text="Per-stage durations, sizes and retry counts of the run.")
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="quizjob_status_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} ({self.status}) – {self.video_url}"
+
+
+class Transcript(models.Model):
+
+    """Cached Whisper transcript of a YouTube video, shared across all users."""
+
+    video_id = models.CharField(max_length=32)
+    model_name = models.CharField(max_length=32)
+    text = models.TextField()
+    title = models.CharField(max_length=255, blank=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["video_id", "model_name"], name="unique_transcript_per_model")
+        ]
+
+    def __str__(self):
+        return f"{self.video_id} ({self.model_name})"
@@ -0,0 +1,20 @@
+import subprocess
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def decode_audio(source: str, headers: dict | None = None) -> np.ndarray:
+    """Decode a file path or media URL to 16 kHz mono float32 PCM through one ffmpeg pipe."""
+
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+    if headers:
+        cmd += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+    cmd += ["-i", source, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"]
+
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Audio-Dekodierung fehlgeschlagen: {e.stderr.decode(errors='ignore')}") from e
+
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
@@ -0,0 +1,157 @@
+import itertools
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from django.conf import settings
+from .audio import SAMPLE_RATE
+from .transcription import WhisperModelRegistry
+
+_FRAME = SAMPLE_RATE // 50  # 20 ms energy frames for silence detection
+_WORD = re.compile(r"\w+")
+
+
+def split_audio(pcm: np.ndarray, window_seconds: float, overlap_seconds: float,
+                search_seconds: float = 2.0) -> list[tuple[int, int]]:
+    """Split PCM into overlapping (start, end) sample spans, cutting at the quietest nearby point."""
+
+    window = int(window_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    search = int(search_seconds * SAMPLE_RATE)
+    total = len(pcm)
+
+    spans, start = [], 0
+    while start < total:
+        end = min(start + window, total)
+        if end < total:
+            end = _quietest_point(pcm, max(start + overlap + 1, end - search), end)
+        spans.append((start, end))
+        if end >= total:
+            break
+        start = end - overlap
+    return spans
+
+
+def _quietest_point(pcm, lo, hi) -> int:
+    frames = (hi - lo) // _FRAME
+    if frames < 2:
+        return hi
+    segment = pcm[lo:lo + frames * _FRAME].reshape(frames, _FRAME)
+    energy = np.square(segment).mean(axis=1)
+    return lo + int(np.argmin(energy)) * _FRAME + _FRAME // 2
+
+
+def stitch_texts(texts: list[str], max_overlap_words: int = 30) -> str:
+    """Join chunk transcripts in order, dropping words repeated across chunk boundaries."""
+
+    words = []
+    for text in texts:
+        incoming = text.split()
+        overlap = _boundary_overlap(words, incoming, max_overlap_words)
+        words.extend(incoming[overlap:])
+    return " ".join(words)
+
+
+def _boundary_overlap(previous, incoming, max_words) -> int:
+    norm = lambda w: "".join(_WORD.findall(w.lower()))
+    for size in range(min(len(previous), len(incoming), max_words), 0, -1):
+        if [norm(w) for w in previous[-size:]] == [norm(w) for w in incoming[:size]]:
+            return size
+    return 0
+
+
+def _init_worker(model_name, device, torch_threads):
+    import torch
+    torch.set_num_threads(torch_threads)
+    WhisperModelRegistry.get(model_name, device)
+
+
+def _transcribe_chunk(args) -> str:
+    chunk, model_name, device = args
+    return WhisperModelRegistry.transcribe(chunk, model_name, device)["text"].strip()
+
+
+class ChunkedTranscriber:
+    """Transcribe long audio as overlapping chunks spread across a process pool.
+
+    The pool is created once with default_workers() processes, each loading
+    Whisper on start. Calls never resize it; `workers` only bounds how many
+    of a call's chunks are in flight at once.
+    """
+
+    _pool = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def transcribe(pcm: np.ndarray, workers: int | None = None) -> str:
+        """Transcribe 16 kHz PCM chunk by chunk in parallel and stitch the text in order."""
+
+        spans = split_audio(pcm, settings.WHISPER_CHUNK_SECONDS, settings.WHISPER_CHUNK_OVERLAP_SECONDS)
+        model_name, device = settings.WHISPER_MODEL, settings.WHISPER_DEVICE
+        jobs = [(pcm[start:end], model_name, device) for start, end in spans]
+
+        limit = min(workers or ChunkedTranscriber.default_workers(), len(jobs))
+        if limit <= 1 or ChunkedTranscriber.default_workers() <= 1:
+            texts = [_transcribe_chunk(job) for job in jobs]
+        else:
+            pool = ChunkedTranscriber._get_pool(model_name, device)
+            try:
+                texts = _map_bounded(pool, jobs, limit)
+            except BrokenProcessPool:
+                ChunkedTranscriber._reset_pool()
+                raise
+
+        return stitch_texts(texts)
+
+    @staticmethod
+    def default_workers() -> int:
+        return settings.WHISPER_CHUNK_WORKERS or _usable_cpus()
+
+    @staticmethod
+    def _reset_pool():
+        with ChunkedTranscriber._lock:
+            if ChunkedTranscriber._pool is not None:
+                ChunkedTranscriber._pool.shutdown(wait=False, cancel_futures=True)
+            ChunkedTranscriber._pool = None
+
+    @staticmethod
+    def _get_pool(model_name, device) -> ProcessPoolExecutor:
+        with ChunkedTranscriber._lock:
+            if ChunkedTranscriber._pool is None:
+                workers = ChunkedTranscriber.default_workers()
+                threads = max(1, _usable_cpus() // workers)
+                # spawn: forking a process that already runs job threads is unsafe
+                ChunkedTranscriber._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(model_name, device, threads),
+                )
+            return ChunkedTranscriber._pool
+
+
+def _map_bounded(pool, jobs, limit) -> list[str]:
+    """Like pool.map(_transcribe_chunk, jobs) with at most `limit` jobs in flight."""
+
+    texts = [None] * len(jobs)
+    queue = iter(enumerate(jobs))
+    pending = {pool.submit(_transcribe_chunk, job): index for index, job in itertools.islice(queue, limit)}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            texts[pending.pop(future)] = future.result()
+            following = next(queue, None)
+            if following is not None:
+                pending[pool.submit(_transcribe_chunk, following[1])] = following[0]
+    return texts
+
+
+def _usable_cpus() -> int:
+    # CPUs this process may run on (cgroups/taskset), not all CPUs of the machine.
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
@@ -0,0 +1,72 @@
+import math
+import re
+from collections import Counter
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+_MAX_SENTENCE_WORDS = 60
+_SEGMENTS = 10  # one per generated question, so every part of the video is represented
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate LLM tokens (about four characters per token)."""
+
+    return math.ceil(len(text) / 4)
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split transcript text into sentences, breaking up unpunctuated runs."""
+
+    sentences = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        words = sentence.split()
+        for i in range(0, len(words), _MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[i:i + _MAX_SENTENCE_WORDS]))
+    return sentences
+
+
+def condense_transcript(text: str, budget_tokens: int) -> str:
+    """Shrink a transcript to the token budget by keeping representative sentences from every part of it."""
+
+    if not budget_tokens or estimate_tokens(text) <= budget_tokens:
+        return text
+
+    sentences = split_sentences(text)
+    scores = _score_sentences(sentences)
+    segments = min(_SEGMENTS, len(sentences))
+    allowance = budget_tokens / segments
+
+    selected = {}
+    for segment in range(segments):
+        lo = segment * len(sentences) // segments
+        hi = (segment + 1) * len(sentences) // segments
+        ranked = sorted(range(lo, hi), key=lambda i: scores[i], reverse=True)
+        used = 0
+        for index in ranked:
+            cost = estimate_tokens(sentences[index]) + 1
+            if used + cost <= allowance:
+                selected[index] = sentences[index]
+                used += cost
+        if not used and ranked:
+            # Long unpunctuated chunks can exceed the whole allowance; keep the best one's start.
+            truncated = _truncate(sentences[ranked[0]], allowance - 1)
+            if truncated:
+                selected[ranked[0]] = truncated
+
+    return " ".join(selected[i] for i in sorted(selected))
+
+
+def _truncate(sentence: str, budget_tokens: float) -> str:
+    words, kept = sentence.split(), 0
+    while kept < len(words) and estimate_tokens(" ".join(words[:kept + 1])) <= budget_tokens:
+        kept += 1
+    return " ".join(words[:kept])
+
+
+def _score_sentences(sentences) -> list[float]:
+    tokenized = [[w for w in _WORD.findall(s.lower()) if len(w) > 3] for s in sentences]
+    frequency = Counter(w for words in tokenized for w in words)
+    return [
+        sum(frequency[w] for w in words) / (len(words) or 1)
+        for words in tokenized
+    ]
@@ -1,40 +1,222 @@
-import json
-import re
-from google import genai
+import asyncio
+import threading
+import time
 from django.conf import settings
-from .prompts import build_quiz_prompt
-from .validators import is_valid_quiz_payload
+from .prompts import build_quiz_prompt, build_followup_prompt
+from .condense import condense_transcript, estimate_tokens
+from .validators import QUESTIONS_PER_QUIZ, valid_questions
+from .resilience import CircuitOpenError, backoff_delays
+from .parsing import iter_json_array_items
+from .llm_backends import select_backends
+from . import tracing
 
-client = genai.Client(api_key=settings.GOOGLE_GENAI_API_KEY)
+
+class InvalidQuizOutput(ValueError):
+    """Raised when a backend answers but the payload contains no usable question."""
+
+
+class QuizAssembly:
+    """Collects valid questions across attempts and decides what to ask for next.
+
+    The first prompt asks for a full quiz. Once some questions are valid, later
+    attempts only request the missing ones with a shorter follow-up prompt
+    instead of regenerating everything.
+    """
+
+    _stats = {"salvaged_responses": 0, "followup_calls": 0, "prompt_tokens_saved": 0}
+    _lock = threading.Lock()
+
+    def __init__(self, transcript: str):
+        self.transcript = condense_transcript(transcript, settings.QUIZ_TRANSCRIPT_TOKEN_BUDGET)
+        self.full_prompt = build_quiz_prompt(self.transcript)
+        self.questions = []
+
+    @property
+    def missing(self) -> int:
+        return max(0, QUESTIONS_PER_QUIZ - len(self.questions))
+
+    @property
+    def complete(self) -> bool:
+        return self.missing == 0
+
+    def next_prompt(self) -> str:
+        """Return the full prompt, or a follow-up for the missing questions only."""
+
+        if not self.questions:
+            return self.full_prompt
+
+        # The follow-up needs proportionally less context than a full quiz.
+        budget = max(500, settings.QUIZ_TRANSCRIPT_TOKEN_BUDGET * self.missing // QUESTIONS_PER_QUIZ)
+        prompt = build_followup_prompt(
+            condense_transcript(self.transcript, budget),
+            self.missing,
+            [q["question_title"] for q in self.questions],
+        )
+        QuizAssembly._count(
+            followup_calls=1,
+            prompt_tokens_saved=max(0, estimate_tokens(self.full_prompt) - estimate_tokens(prompt)),
+        )
+        return prompt
+
+    def add(self, text: str):
+        """Merge the valid questions of a response; raise InvalidQuizOutput if there are none."""
+
+        data = list(iter_json_array_items(text))
+        if not data:
+            raise InvalidQuizOutput("No JSON array items in response")
+
+        fresh = valid_questions(self.questions + valid_questions(data))[len(self.questions):]
+        if not fresh:
+            raise InvalidQuizOutput("Quiz payload contained no valid question")
+
+        self.questions.extend(fresh[:self.missing])
+        if not self.complete:
+            QuizAssembly._count(salvaged_responses=1)
+
+    def result(self) -> list:
+        return self.questions[:QUESTIONS_PER_QUIZ]
+
+    @staticmethod
+    def stats() -> dict:
+        """Return how many partial responses were kept and what follow-ups saved."""
+
+        with QuizAssembly._lock:
+            return dict(QuizAssembly._stats)
+
+    @staticmethod
+    def _count(**amounts):
+        with QuizAssembly._lock:
+            for key, amount in amounts.items():
+                QuizAssembly._stats[key] += amount
 
 
 class GeminiQuizService:
-    """Service to generate 10 multiple-choice quiz questions from a transcript using Gemini."""
+    """Service to generate 10 multiple-choice quiz questions from a transcript.
 
+    Despite the name it is backend-agnostic: each attempt goes to the first
+    healthy backend from llm_backends.select_backends (Gemini by default).
+    """
 
     @staticmethod
-    def generate_questions(transcript: str, retries=5):
-        """Generate validated quiz questions from transcript text."""
+    def generate_questions(transcript: str, retries=None):
+        """Generate validated quiz questions from transcript text.
+
+        Valid questions from imperfect responses are kept and only the missing
+        ones are requested again. Transient failures (timeouts, 429/5xx, unusable
+        output) are retried with exponential backoff and jitter. A failing backend
+        hands over to the next configured one; fatal errors raise once no backend
+        is left and CircuitOpenError fails fast while all of them are degraded.
+        """
+
+        assembly = QuizAssembly(transcript)
+        failed = set()
+        last_error = None
 
-        prompt = build_quiz_prompt(transcript)
+        for delay in GeminiQuizService._delays(retries):
+            time.sleep(delay)
+            # Route on the raw length; the condensed transcript is capped by the token budget.
+            backends = select_backends(transcript)
+            backend = GeminiQuizService._pick_backend(backends, failed)
 
-        for _ in range(retries):
+            prompt = assembly.next_prompt()
+            tracing.incr("llm_attempts")
+            tracing.incr("prompt_chars", len(prompt))
+            tracing.record(llm_backend=backend.name)
+
+            started = time.perf_counter()
             try:
-                response = client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt
-                )
+                assembly.add(backend.generate(prompt))
+            except Exception as e:
+                last_error = e
+                seconds = time.perf_counter() - started
+                if not GeminiQuizService._record_failure(backend, e, seconds, failed, backends):
+                    raise RuntimeError("Gemini failed") from e
+                continue
+
+            GeminiQuizService._record_success(backend, assembly, time.perf_counter() - started)
+            if assembly.complete:
+                return assembly.result()
+
+        raise RuntimeError("Gemini failed") from last_error
+
+    @staticmethod
+    async def agenerate_questions(transcript: str, retries=None):
+        """Async variant of generate_questions using the backends' non-blocking clients."""
 
-                text = response.text.strip()
-                match = re.search(r"\[[\s\S]*\]", text)
-                if not match:
-                    continue
+        assembly = QuizAssembly(transcript)
+        failed = set()
+        last_error = None
 
-                data = json.loads(match.group(0))
-                if is_valid_quiz_payload(data):
-                    return data
+        for delay in GeminiQuizService._delays(retries):
+            await asyncio.sleep(delay)
+            # Route on the raw length; the condensed transcript is capped by the token budget.
+            backends = select_backends(transcript)
+            backend = GeminiQuizService._pick_backend(backends, failed)
 
-            except Exception:
+            prompt = assembly.next_prompt()
+            tracing.incr("llm_attempts")
+            tracing.incr("prompt_chars", len(prompt))
+            tracing.record(llm_backend=backend.name)
+
+            started = time.perf_counter()
+            try:
+                assembly.add(await backend.agenerate(prompt))
+            except Exception as e:
+                last_error = e
+                seconds = time.perf_counter() - started
+                if not GeminiQuizService._record_failure(backend, e, seconds, failed, backends):
+                    raise RuntimeError("Gemini failed") from e
                 continue
 
-        raise RuntimeError("Gemini failed")
+            GeminiQuizService._record_success(backend, assembly, time.perf_counter() - started)
+            if assembly.complete:
+                return assembly.result()
+
+        raise RuntimeError("Gemini failed") from last_error
+
+    @staticmethod
+    def _pick_backend(backends, failed):
+        """Return the first backend with a closed circuit, preferring ones that have not failed this call."""
+
+        candidates = [b for b in backends if b.name not in failed] or backends
+        error = None
+        for backend in candidates:
+            try:
+                backend.breaker.before_call()
+                return backend
+            except CircuitOpenError as e:
+                error = error or e
+        raise error
+
+    @staticmethod
+    def _delays(retries):
+        return backoff_delays(
+            retries or settings.LLM_MAX_ATTEMPTS,
+            settings.LLM_BACKOFF_BASE_SECONDS,
+            settings.LLM_BACKOFF_MAX_SECONDS,
+        )
+
+    @staticmethod
+    def _record_success(backend, assembly, seconds):
+        backend.breaker.record_success()
+        backend.metrics.record("ok" if assembly.complete else "partial", seconds)
+
+    @staticmethod
+    def _record_failure(backend, error, seconds, failed, backends) -> bool:
+        """Record a failed attempt; return whether another attempt is worth making.
+
+        `backends` is the list the attempt was picked from, so the long-prompt
+        backend counts as a failover target too.
+        """
+
+        if isinstance(error, InvalidQuizOutput):
+            # The backend answered; the service itself is healthy.
+            backend.breaker.record_success()
+            backend.metrics.record("invalid", seconds)
+            return True
+
+        backend.breaker.record_failure()
+        backend.metrics.record(type(error).__name__, seconds)
+        failed.add(backend.name)
+        others_left = any(b.name not in failed for b in backends)
+        return backend.is_retryable(error) or others_left
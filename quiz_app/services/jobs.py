@@ -0,0 +1,221 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from quiz_app.models import QuizJob
+from .quiz_creator import QuizCreator
+from .quotas import JobQuota
+from . import tracing
+
+
+class QuizJobQueue:
+    """Runs quiz generation outside the request/response cycle.
+
+    QUIZ_JOBS_MODE selects how queued jobs are executed:
+        - "thread": a per-process thread pool of QUIZ_JOB_WORKERS workers, plus
+                    one extra worker reserved for videos over QUIZ_LONG_VIDEO_SECONDS
+        - "db":     jobs stay pending until `manage.py process_quiz_jobs` claims them
+        - "eager":  run inline during enqueue (tests, debugging)
+
+    Jobs orphaned by a restarted process are handled by recover(), which
+    runs at most every QUIZ_JOB_RECOVERY_INTERVAL_SECONDS from enqueue, job
+    polling and the worker command, and on demand via `recover_quiz_jobs`.
+    """
+
+    _executors = {}
+    _submitted = set()
+    _lock = threading.Lock()
+    _last_recovery = 0.0
+
+    @staticmethod
+    def enqueue(user, url: str) -> QuizJob:
+        """Reserve a job, probe the video and hand the job to the configured executor.
+
+        Raises QuotaExceeded if the user or the server already has too many
+        active jobs, and VideoRejectedError if the video is unavailable or
+        exceeds the configured limits; in both cases nothing is queued.
+        """
+
+        # Reserve the quota slot first: the probe takes seconds and must not race the cap.
+        job = JobQuota.reserve(user, url)
+        try:
+            video = QuizCreator.preflight(url)
+        except BaseException:
+            job.delete()
+            raise
+        job.video_url, job.duration, job.stage = video["url"], video["duration"], "queued"
+        job.save(update_fields=["video_url", "duration", "stage", "updated_at"])
+        mode = settings.QUIZ_JOBS_MODE
+        QuizJobQueue.maybe_recover()
+
+        if mode == "eager":
+            QuizJobQueue.run(job.pk)
+            job.refresh_from_db()
+        elif mode == "thread":
+            transaction.on_commit(lambda: QuizJobQueue._submit(job.pk, QuizJobQueue.is_long(job)))
+
+        return job
+
+    @staticmethod
+    def is_long(job) -> bool:
+        """Whether a job's video is long enough to be scheduled on the long-running lane."""
+
+        return (job.duration or 0) > settings.QUIZ_LONG_VIDEO_SECONDS
+
+    @staticmethod
+    def claim(job_id) -> bool:
+        """Atomically move a pending job to running; False if another worker got it."""
+
+        claimed = QuizJob.objects.filter(pk=job_id, status=QuizJob.Status.PENDING, stage="queued").update(
+            status=QuizJob.Status.RUNNING, stage="starting", updated_at=timezone.now())
+        return claimed == 1
+
+    @staticmethod
+    def next_pending_id(lane: str | None = None):
+        """Return the id of the oldest pending job, optionally only "short" or "long" ones."""
+
+        pending = QuizJob.objects.filter(status=QuizJob.Status.PENDING, stage="queued")
+        if lane == "long":
+            pending = pending.filter(duration__gt=settings.QUIZ_LONG_VIDEO_SECONDS)
+        elif lane == "short":
+            pending = pending.exclude(duration__gt=settings.QUIZ_LONG_VIDEO_SECONDS)
+
+        return pending.order_by("created_at", "id").values_list("id", flat=True).first()
+
+    @staticmethod
+    def run(job_id):
+        """Claim and execute a single job if it is still pending."""
+
+        if QuizJobQueue.claim(job_id):
+            QuizJobQueue.execute(job_id)
+
+    @staticmethod
+    def execute(job_id):
+        """Execute an already claimed job, recording its outcome."""
+
+        job = QuizJob.objects.select_related("user").get(pk=job_id)
+
+        def report(stage, progress):
+            QuizJob.objects.filter(pk=job_id).update(
+                stage=stage, progress=progress, updated_at=timezone.now())
+
+        with tracing.trace() as pipeline:
+            try:
+                quiz = QuizCreator.create(job.user, job.video_url, on_stage=report)
+            except Exception as e:
+                # Name the failing stage so errors are not just an opaque message.
+                error = f"{pipeline.failed_stage}: {e}" if pipeline.failed_stage else str(e)
+                QuizJob.objects.filter(pk=job_id).update(
+                    status=QuizJob.Status.FAILED, error=error,
+                    metrics=pipeline.as_dict(), updated_at=timezone.now())
+            else:
+                QuizJob.objects.filter(pk=job_id).update(
+                    status=QuizJob.Status.SUCCEEDED, stage="done", progress=100,
+                    quiz=quiz, metrics=pipeline.as_dict(), updated_at=timezone.now())
+
+    @staticmethod
+    def recover() -> dict:
+        """Fail jobs stuck past QUIZ_JOB_TIMEOUT_SECONDS and requeue orphaned pending ones.
+
+        Running jobs without progress for the timeout and reservations stuck
+        in "probing" are marked failed. In thread mode, queued jobs older than
+        QUIZ_JOB_REQUEUE_SECONDS that this process has not submitted are
+        handed to its pool; claim() keeps a job from running twice. In db mode
+        the worker command picks pending jobs up anyway.
+        """
+
+        now = timezone.now()
+        timeout = now - timedelta(seconds=settings.QUIZ_JOB_TIMEOUT_SECONDS)
+        requeue = now - timedelta(seconds=settings.QUIZ_JOB_REQUEUE_SECONDS)
+
+        timed_out = QuizJob.objects.filter(status=QuizJob.Status.RUNNING, updated_at__lt=timeout).update(
+            status=QuizJob.Status.FAILED, error="Zeitüberschreitung: Job wurde nicht abgeschlossen", updated_at=now)
+        abandoned = QuizJob.objects.filter(
+            status=QuizJob.Status.PENDING, stage="probing", updated_at__lt=requeue).update(
+            status=QuizJob.Status.FAILED, error="Abgebrochen vor dem Start", updated_at=now)
+
+        requeued = 0
+        if settings.QUIZ_JOBS_MODE == "thread":
+            orphans = QuizJob.objects.filter(
+                status=QuizJob.Status.PENDING, stage="queued", updated_at__lt=requeue).only("id", "duration")
+            for job in orphans:
+                with QuizJobQueue._lock:
+                    if job.pk in QuizJobQueue._submitted:
+                        continue
+                QuizJobQueue._submit(job.pk, QuizJobQueue.is_long(job))
+                requeued += 1
+
+        return {"timed_out": timed_out, "abandoned": abandoned, "requeued": requeued}
+
+    @staticmethod
+    def maybe_recover():
+        """Run recover() if this process has not done so within QUIZ_JOB_RECOVERY_INTERVAL_SECONDS."""
+
+        interval = settings.QUIZ_JOB_RECOVERY_INTERVAL_SECONDS
+        with QuizJobQueue._lock:
+            now = time.monotonic()
+            if QuizJobQueue._last_recovery and now - QuizJobQueue._last_recovery < interval:
+                return
+            QuizJobQueue._last_recovery = now
+        QuizJobQueue.recover()
+
+    @staticmethod
+    def pipeline_stats(limit: int = 500) -> dict:
+        """Aggregate stage timings, sizes and outcomes of the most recent traced jobs."""
+
+        rows = list(
+            QuizJob.objects.filter(metrics__isnull=False)
+            .order_by("-id").values_list("status", "metrics")[:limit])
+
+        outcomes, failed_stages = Counter(), Counter()
+        totals, stages, values = [], defaultdict(list), defaultdict(list)
+        for status, metrics in rows:
+            outcomes[status] += 1
+            totals.append(metrics["total_seconds"])
+            for name, seconds in metrics.get("stages", {}).items():
+                stages[name].append(seconds)
+            for key in ("audio_bytes", "audio_seconds", "transcript_chars", "prompt_chars", "llm_attempts"):
+                if metrics.get(key) is not None:
+                    values[key].append(metrics[key])
+            if metrics.get("failed_stage"):
+                failed_stages[metrics["failed_stage"]] += 1
+
+        return {
+            "jobs": len(rows),
+            "outcomes": dict(outcomes),
+            "failed_stages": dict(failed_stages),
+            "total_seconds": tracing.summarize(totals),
+            "stages": {name: tracing.summarize(samples) for name, samples in stages.items()},
+            "values": {key: tracing.summarize(samples) for key, samples in values.items()},
+        }
+
+    @staticmethod
+    def _submit(job_id, long_running=False):
+        lane = "long" if long_running else "short"
+        with QuizJobQueue._lock:
+            executor = QuizJobQueue._executors.get(lane)
+            if executor is None:
+                workers = 1 if long_running else settings.QUIZ_JOB_WORKERS
+                executor = QuizJobQueue._executors[lane] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=f"quiz-job-{lane}")
+            QuizJobQueue._submitted.add(job_id)
+        executor.submit(QuizJobQueue.run_in_worker, job_id)
+
+    @staticmethod
+    def run_in_worker(job_id, claimed=False):
+        """Run a job on a pool thread, which owns its own database connection."""
+
+        close_old_connections()
+        try:
+            if claimed:
+                QuizJobQueue.execute(job_id)
+            else:
+                QuizJobQueue.run(job_id)
+        finally:
+            with QuizJobQueue._lock:
+                QuizJobQueue._submitted.discard(job_id)
+            close_old_connections()
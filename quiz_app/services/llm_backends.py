@@ -0,0 +1,272 @@
+import asyncio
+import functools
+import hashlib
+import json
+import re
+import threading
+import time
+import httpx
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .condense import estimate_tokens, split_sentences
+from .resilience import CallMetrics, CircuitBreaker
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# google.genai is imported on first use; it adds noticeable startup time to
+# every web worker and management command otherwise.
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide genai client, creating it on first use.
+
+    One client per process so the underlying HTTP connection pool is reused.
+    """
+
+    global _client
+    with _client_lock:
+        if _client is None:
+            from google import genai
+            from google.genai import types
+
+            _client = genai.Client(
+                api_key=settings.GOOGLE_GENAI_API_KEY,
+                http_options=types.HttpOptions(timeout=int(settings.GEMINI_TIMEOUT_SECONDS * 1000)),
+            )
+        return _client
+
+
+@functools.cache
+def quiz_response_schema():
+    """Gemini response schema mirroring the shape checked by validators.is_valid_question."""
+
+    from google.genai import types
+
+    return types.Schema(
+        type=types.Type.ARRAY,
+        items=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "question_title": types.Schema(type=types.Type.STRING),
+                "question_options": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(type=types.Type.STRING),
+                    min_items=4,
+                    max_items=4,
+                ),
+                "answer": types.Schema(type=types.Type.STRING),
+            },
+            required=["question_title", "question_options", "answer"],
+            property_ordering=["question_title", "question_options", "answer"],
+        ),
+    )
+
+
+class LLMBackend:
+    """Interface for a text generation backend used to produce quiz JSON.
+
+    Every backend instance owns a circuit breaker and latency metrics, so
+    routing can skip providers that are failing or slow.
+    """
+
+    name = ""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            self.name, settings.LLM_CIRCUIT_FAILURES, settings.LLM_CIRCUIT_RESET_SECONDS)
+        self.metrics = CallMetrics()
+
+    def generate(self, prompt: str) -> str:
+        """Return the raw model output for a prompt."""
+
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str) -> str:
+        """Async variant of generate; runs the sync call in a thread unless overridden."""
+
+        return await asyncio.to_thread(self.generate, prompt)
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Whether the error is transient for this provider."""
+
+        return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini with schema-constrained JSON output."""
+
+    name = "gemini"
+
+    def generate(self, prompt: str) -> str:
+        response = get_client().models.generate_content(
+            model=settings.GEMINI_MODEL, contents=prompt, config=self._config())
+        return response.text or ""
+
+    async def agenerate(self, prompt: str) -> str:
+        response = await get_client().aio.models.generate_content(
+            model=settings.GEMINI_MODEL, contents=prompt, config=self._config())
+        return response.text or ""
+
+    def is_retryable(self, error: Exception) -> bool:
+        from google.genai import errors
+
+        if isinstance(error, errors.APIError):
+            return error.code in RETRYABLE_STATUS_CODES
+        return super().is_retryable(error)
+
+    @staticmethod
+    def _config():
+        """Request schema-constrained JSON unless GEMINI_STRUCTURED_OUTPUT is off."""
+
+        from google.genai import types
+
+        if not settings.GEMINI_STRUCTURED_OUTPUT:
+            return None
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=quiz_response_schema(),
+        )
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI chat completions."""
+
+    name = "openai"
+
+    def __init__(self):
+        super().__init__()
+        import openai
+
+        self._openai = openai
+        self._client = openai.OpenAI(
+            api_key=settings.OPENAI_API_KEY, timeout=settings.OPENAI_TIMEOUT_SECONDS)
+        self._async_client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY, timeout=settings.OPENAI_TIMEOUT_SECONDS)
+
+    def generate(self, prompt: str) -> str:
+        response = self._client.chat.completions.create(
+            model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}])
+        return response.choices[0].message.content or ""
+
+    async def agenerate(self, prompt: str) -> str:
+        response = await self._async_client.chat.completions.create(
+            model=settings.OPENAI_MODEL, messages=[{"role": "user", "content": prompt}])
+        return response.choices[0].message.content or ""
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, (
+            self._openai.APITimeoutError,
+            self._openai.APIConnectionError,
+            self._openai.RateLimitError,
+            self._openai.InternalServerError,
+        ))
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic offline backend that builds questions from the prompt's transcript.
+
+    Needs no network or API key, so the full pipeline can be load-tested
+    locally. FAKE_LLM_LATENCY_SECONDS simulates provider latency.
+    """
+
+    name = "fake"
+
+    def generate(self, prompt: str) -> str:
+        time.sleep(settings.FAKE_LLM_LATENCY_SECONDS)
+        return json.dumps(self._questions(prompt))
+
+    async def agenerate(self, prompt: str) -> str:
+        await asyncio.sleep(settings.FAKE_LLM_LATENCY_SECONDS)
+        return json.dumps(self._questions(prompt))
+
+    @staticmethod
+    def _questions(prompt: str) -> list:
+        count_match = re.search(r"EXACTLY (\d+)", prompt)
+        count = int(count_match.group(1)) if count_match else 10
+        transcript = prompt.rsplit("TRANSCRIPT:", 1)[-1]
+        statements = list(dict.fromkeys(s[:80] for s in split_sentences(transcript) if s)) or ["(empty)"]
+        seed = hashlib.sha1(prompt.encode()).hexdigest()[:6]
+
+        questions = []
+        for i in range(count):
+            correct = statements[i % len(statements)]
+            options = [correct]
+            for step in range(1, len(statements)):
+                if len(options) == 4:
+                    break
+                options.append(statements[(i + step * 7) % len(statements)])
+            options = list(dict.fromkeys(options))
+            options += [f"None of the above ({n})" for n in range(1, 5 - len(options))]
+            questions.append({
+                "question_title": f"Which statement is made in the video? [{seed}-{i + 1}]",
+                "question_options": options,
+                "answer": correct,
+            })
+        return questions
+
+
+_BACKEND_CLASSES = {
+    GeminiBackend.name: GeminiBackend,
+    OpenAIBackend.name: OpenAIBackend,
+    FakeBackend.name: FakeBackend,
+}
+_instances = {}
+_lock = threading.Lock()
+
+
+def register_backend(cls):
+    """Make an LLMBackend subclass selectable by its name in QUIZ_LLM_BACKENDS."""
+
+    _BACKEND_CLASSES[cls.name] = cls
+    return cls
+
+
+def get_backend(name: str) -> LLMBackend:
+    """Return the process-wide instance of a backend by name."""
+
+    with _lock:
+        if name not in _instances:
+            if name not in _BACKEND_CLASSES:
+                raise ValueError(f"Unknown LLM backend: {name}")
+            _instances[name] = _BACKEND_CLASSES[name]()
+        return _instances[name]
+
+
+def select_backends(transcript: str) -> list[LLMBackend]:
+    """Return backends in the order they should be tried for this transcript.
+
+    Starts from QUIZ_LLM_BACKENDS, moves QUIZ_LLM_LONG_PROMPT_BACKEND to the
+    front for transcripts over QUIZ_LLM_LONG_PROMPT_TOKENS (pass the raw
+    transcript, not the condensed one), and moves backends whose recent p95
+    latency exceeds QUIZ_LLM_SLOW_P95_MS to the back.
+    """
+
+    names = list(settings.QUIZ_LLM_BACKENDS)
+    if not names:
+        raise ImproperlyConfigured("QUIZ_LLM_BACKENDS must name at least one LLM backend")
+    long_backend = settings.QUIZ_LLM_LONG_PROMPT_BACKEND
+    if long_backend and estimate_tokens(transcript) > settings.QUIZ_LLM_LONG_PROMPT_TOKENS:
+        names = [long_backend] + [n for n in names if n != long_backend]
+
+    backends = [get_backend(name) for name in names]
+    slow_ms = settings.QUIZ_LLM_SLOW_P95_MS
+    if slow_ms:
+        backends.sort(key=lambda b: (b.metrics.snapshot()["p95_ms"] or 0) > slow_ms)
+    return backends
+
+
+def backend_stats() -> dict:
+    """Return latency metrics and circuit state for every instantiated backend."""
+
+    with _lock:
+        instances = dict(_instances)
+    return {name: {**b.metrics.snapshot(), "circuit": b.breaker.state} for name, b in instances.items()}
+
+
+def reset_backends():
+    """Drop all backend instances (and with them their breakers and metrics)."""
+
+    with _lock:
+        _instances.clear()
@@ -0,0 +1,41 @@
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array_items(text: str):
+    """Yield the elements of the first JSON array in text, one at a time.
+
+    Elements are decoded incrementally with `raw_decode`, so complete items
+    before a truncated or malformed tail are still returned, and anything
+    after the closing bracket (stray brackets, prose) is never scanned.
+    """
+
+    start = text.find("[")
+    if start < 0:
+        return
+
+    pos, end = start + 1, len(text)
+    while True:
+        pos = _skip_whitespace(text, pos)
+        if pos >= end or text[pos] == "]":
+            return
+
+        try:
+            item, pos = _decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return
+        yield item
+
+        pos = _skip_whitespace(text, pos)
+        if pos < end and text[pos] == ",":
+            pos += 1
+        else:
+            return
+
+
+def _skip_whitespace(text, pos):
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
@@ -41,3 +41,26 @@ EXAMPLE FORMAT:
 TRANSCRIPT:
 {transcript}
 """
+
+
+def build_followup_prompt(transcript: str, count: int, existing_titles: list[str]) -> str:
+    """Build a short prompt asking only for the questions still missing from a partial quiz."""
+
+    existing = "\n".join(f"- {title}" for title in existing_titles)
+
+    return f"""
+You are a system that generates quiz questions strictly as JSON.
+
+TASK:
+Create EXACTLY {count} additional multiple-choice quiz questions based ONLY on the transcript below.
+
+REQUIREMENTS:
+- Output ONLY a raw JSON array of {count} objects, no markdown or other text.
+- Each object has "question_title" (40-70 characters), "question_options" (EXACTLY 4 unique strings)
+  and "answer" (one of the options, verbatim).
+- Do NOT repeat or rephrase any of these existing questions:
+{existing}
+
+TRANSCRIPT:
+{transcript}
+"""
@@ -1,26 +1,127 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from asgiref.sync import sync_to_async
 from quiz_app.models import Quiz, Question
 from quiz_app.utils import extract_video_id
 from .youtube import YouTubeService
 from .transcription import TranscriptionService
 from .gemini import GeminiQuizService
-from django.db import transaction
+from .transcript_cache import TranscriptCache
+from .single_flight import SingleFlight
+from .scratch import ScratchSpace
+from . import tracing
+from django.conf import settings
+from django.db import close_old_connections, transaction
 
 class QuizCreator:
     """Orchestrates creating a Quiz from a YouTube video."""
 
+    _offload_executor = None
+    _offload_lock = threading.Lock()
+
     @staticmethod
-    def create(user, youtube_url: str) -> Quiz:
+    def create(user, youtube_url: str, on_stage=None) -> Quiz:
+        """Run the full pipeline; `on_stage(stage, progress)` is called as it advances."""
+
+        report = on_stage or (lambda stage, progress: None)
         video_id = QuizCreator._extract_video_id(youtube_url)
         clean_url = f"https://www.youtube.com/watch?v={video_id}"
 
-        quiz = QuizCreator._create_quiz_placeholder(user, clean_url)
-        transcript, info = QuizCreator._download_and_transcribe(clean_url)
-        questions = GeminiQuizService.generate_questions(transcript)
-        QuizCreator._save_questions(quiz, questions)
-        QuizCreator._update_quiz_info(quiz, info)
-
+        transcript, info = QuizCreator._load_transcript(video_id, clean_url, report)
+        report("generating", 70)
+        with tracing.stage("llm"):
+            questions = GeminiQuizService.generate_questions(transcript)
+        report("saving", 90)
+        with tracing.stage("save"):
+            quiz, _ = QuizCreator._save_quiz(user, clean_url, questions, info)
         return quiz
 
+    @staticmethod
+    async def acreate(user, youtube_url: str, on_stage=None) -> tuple[Quiz, list[Question]]:
+        """Async variant of create for ASGI views.
+
+        Download and transcription run on a dedicated thread pool, Gemini is
+        awaited through its async client, so the event loop stays free while
+        many quizzes are generated concurrently. Returns the quiz and its new
+        questions so the response can be built without another query.
+        """
+
+        report = on_stage or (lambda stage, progress: None)
+        video_id = QuizCreator._extract_video_id(youtube_url)
+        clean_url = f"https://www.youtube.com/watch?v={video_id}"
+
+        transcript, info = await QuizCreator._run_offloaded(
+            QuizCreator._load_transcript, video_id, clean_url, report)
+        report("generating", 70)
+        with tracing.stage("llm"):
+            questions = await GeminiQuizService.agenerate_questions(transcript)
+        report("saving", 90)
+        with tracing.stage("save"):
+            return await sync_to_async(QuizCreator._save_quiz)(user, clean_url, questions, info)
+
+    @staticmethod
+    def _get_offload_executor() -> ThreadPoolExecutor:
+        with QuizCreator._offload_lock:
+            if QuizCreator._offload_executor is None:
+                QuizCreator._offload_executor = ThreadPoolExecutor(
+                    max_workers=settings.QUIZ_ASYNC_TRANSCRIPTION_WORKERS,
+                    thread_name_prefix="quiz-transcribe")
+            return QuizCreator._offload_executor
+
+    @staticmethod
+    async def _run_offloaded(fn, *args):
+        # Copy the context so an active pipeline trace follows the work onto the pool thread.
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            QuizCreator._get_offload_executor(),
+            partial(context.run, QuizCreator._offloaded, fn, *args),
+        )
+
+    @staticmethod
+    def _offloaded(fn, *args):
+        # Pool threads open their own database connections; don't leak them.
+        close_old_connections()
+        try:
+            return fn(*args)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def preflight(youtube_url: str) -> dict:
+        """Validate a URL and probe its metadata before any audio is fetched.
+
+        Returns the video id, normalized URL and duration in seconds (None when
+        the transcript is already cached and no probe is needed). Raises
+        VideoRejectedError for unavailable or oversized videos and
+        ScratchSpaceFull while downloads in flight exhaust the disk quota.
+        """
+
+        video_id = QuizCreator._extract_video_id(youtube_url)
+        clean_url = f"https://www.youtube.com/watch?v={video_id}"
+
+        duration = None
+        if not TranscriptCache.has(video_id):
+            meta = YouTubeService.probe(clean_url, video_id)
+            duration = meta["duration"]
+            if settings.YOUTUBE_AUDIO_MODE != "stream":
+                ScratchSpace.ensure_capacity(meta.get("filesize"))
+
+        return {"video_id": video_id, "url": clean_url, "duration": duration}
+
+    @staticmethod
+    async def apreflight(youtube_url: str) -> dict:
+        """Async variant of preflight.
+
+        The probe is short, so it gets its own worker thread instead of
+        queueing on the offload pool behind running transcriptions.
+        """
+
+        return await sync_to_async(QuizCreator._offloaded, thread_sensitive=False)(
+            QuizCreator.preflight, youtube_url)
+
     @staticmethod
     def _extract_video_id(url: str) -> str:
         video_id = extract_video_id(url)
@@ -29,34 +130,73 @@ class QuizCreator:
         return video_id
 
     @staticmethod
-    def _create_quiz_placeholder(user, url) -> Quiz:
-        with transaction.atomic():
-            return Quiz.objects.create(
-                user=user,
-                title="Quiz wird erstellt...",
-                description="Transkription läuft...",
-                video_url=url
-            )
+    def _load_transcript(video_id, url, report):
+        cached = TranscriptCache.get(video_id)
+        if cached:
+            tracing.record(transcript_cache="hit", transcript_chars=len(cached.text))
+            return cached.text, {"title": cached.title}
+
+        tracing.record(transcript_cache="miss")
+        transcript, info = SingleFlight.do(
+            f"transcript:{video_id}",
+            lambda: QuizCreator._transcribe_once(video_id, url, report),
+            on_wait=lambda: report("waiting", 10),
+        )
+        tracing.record(transcript_chars=len(transcript))
+        return transcript, info
 
     @staticmethod
-    def _download_and_transcribe(url):
-        audio, info = YouTubeService.download_audio(url)
-        transcript = TranscriptionService.transcribe(audio)
+    def _transcribe_once(video_id, url, report):
+        # Another process may have finished this video while we waited for the lock.
+        cached = TranscriptCache.get(video_id)
+        if cached:
+            return cached.text, {"title": cached.title}
+
+        transcript, info = QuizCreator._download_and_transcribe(url, report)
+        TranscriptCache.store(video_id, transcript, info)
         return transcript, info
 
     @staticmethod
-    def _save_questions(quiz, questions):
-        for q in questions:
-            Question.objects.create(
-                quiz=quiz,
-                question_title=q["question_title"],
-                question_options=q["question_options"],
-                answer=q["answer"]
-            )
+    def _download_and_transcribe(url, report):
+        report("downloading", 10)
+        if settings.YOUTUBE_AUDIO_MODE == "stream":
+            with tracing.stage("download"):
+                audio, info = YouTubeService.stream_audio(url)
+            tracing.record(audio_bytes=audio.nbytes, audio_seconds=info.get("duration"))
+            report("transcribing", 40)
+            with tracing.stage("transcription"):
+                return TranscriptionService.transcribe(audio), info
+
+        # The download is deleted as soon as it is transcribed, also on failure.
+        with ScratchSpace.job() as workdir:
+            with tracing.stage("download"):
+                audio, info = YouTubeService.download_audio(url, workdir)
+            tracing.record(audio_bytes=ScratchSpace.size(workdir), audio_seconds=info.get("duration"))
+            report("transcribing", 40)
+            with tracing.stage("transcription"):
+                return TranscriptionService.transcribe(audio), info
 
     @staticmethod
-    def _update_quiz_info(quiz, info):
-        quiz.title = info.get("title", "Neues Quiz")
-        quiz.description = ""
-        quiz.save()
+    def _save_quiz(user, url, questions, info) -> tuple[Quiz, list[Question]]:
+        """Create the quiz and insert all its questions in one transaction.
+
+        Nothing is written before the pipeline succeeded, so failed runs
+        leave no empty quizzes behind. Returns the quiz together with the
+        created questions, which QuizReadSerializer.one can serialize
+        without querying them again.
+        """
+
+        with transaction.atomic():
+            quiz = Quiz.objects.create(
+                user=user, title=info.get("title") or "Neues Quiz", description="", video_url=url)
+            created = Question.objects.bulk_create(
+                Question(
+                    quiz=quiz,
+                    question_title=q["question_title"],
+                    question_options=q["question_options"],
+                    answer=q["answer"]
+                )
+                for q in questions
+            )
 
+        return quiz, created
@@ -0,0 +1,108 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from quiz_app.models import QuizJob
+
+
+class QuotaExceeded(RuntimeError):
+    """Raised when a quiz creation is refused by the per-user cap or the global admission check."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobQuota:
+    """Admission control for quiz creation.
+
+    Two limits are checked before a video is even probed, together with
+    reserving the slot (see reserve()), so concurrent requests cannot all
+    pass the check before any of them is counted:
+        - QUIZ_MAX_ACTIVE_JOBS_PER_USER: pending/running jobs of one user
+        - QUIZ_MAX_ACTIVE_JOBS: pending/running jobs overall, i.e. the
+          transcription backlog; beyond it new work is shed
+    Active jobs are counted in the database, plus creations running inline on
+    the async endpoint of this process. Jobs not updated for
+    QUIZ_ACTIVE_JOB_MAX_AGE_SECONDS are treated as abandoned and not counted.
+    """
+
+    _inline = Counter()
+    _lock = threading.Lock()
+    _stats = {"admitted": 0, "rejected_user": 0, "rejected_backlog": 0}
+
+    @classmethod
+    def reserve(cls, user, video_url: str) -> QuizJob:
+        """Check the caps and create a pending job in stage "probing" as one step.
+
+        Raises QuotaExceeded instead. The job is not claimed by workers until
+        its stage is set to "queued" after the probe.
+        """
+
+        with cls._lock, transaction.atomic():
+            # Row lock serializes reservations of one user across processes (no-op on SQLite).
+            get_user_model().objects.select_for_update().filter(pk=user.pk).exists()
+            cls._check(user)
+            return QuizJob.objects.create(user=user, video_url=video_url, stage="probing")
+
+    @classmethod
+    def admit(cls, user, inline: bool = False):
+        """Raise QuotaExceeded if user may not start another creation now.
+
+        With inline=True the creation is counted in this process until
+        release(user) is called; check and reservation happen under one lock.
+        """
+
+        with cls._lock:
+            cls._check(user)
+            if inline:
+                cls._inline[user.pk] += 1
+
+    @classmethod
+    def _check(cls, user):
+        # Caller holds cls._lock.
+        per_user, overall = settings.QUIZ_MAX_ACTIVE_JOBS_PER_USER, settings.QUIZ_MAX_ACTIVE_JOBS
+        active = cls._active_jobs()
+        if per_user and active.filter(user_id=user.pk).count() + cls._inline[user.pk] >= per_user:
+            cls._stats["rejected_user"] += 1
+            raise QuotaExceeded(
+                "Zu viele laufende Quiz-Erstellungen, bitte warte bis eine abgeschlossen ist",
+                settings.QUIZ_QUOTA_RETRY_AFTER_SECONDS)
+        if overall and active.count() + cls._inline.total() >= overall:
+            cls._stats["rejected_backlog"] += 1
+            raise QuotaExceeded(
+                "Server ist ausgelastet, bitte später erneut versuchen",
+                settings.QUIZ_QUOTA_RETRY_AFTER_SECONDS)
+        cls._stats["admitted"] += 1
+
+    @classmethod
+    def release(cls, user):
+        """End an inline reservation made by admit(user, inline=True)."""
+
+        with cls._lock:
+            cls._inline[user.pk] -= 1
+            if cls._inline[user.pk] <= 0:
+                del cls._inline[user.pk]
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Return admission counters, inline creations and the current job backlog."""
+
+        with cls._lock:
+            snapshot = {**cls._stats, "inline": cls._inline.total()}
+        return {**snapshot, "backlog": cls._active_jobs().count(), "max_backlog": settings.QUIZ_MAX_ACTIVE_JOBS}
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._inline.clear()
+            cls._stats.update(admitted=0, rejected_user=0, rejected_backlog=0)
+
+    @staticmethod
+    def _active_jobs():
+        cutoff = timezone.now() - timedelta(seconds=settings.QUIZ_ACTIVE_JOB_MAX_AGE_SECONDS)
+        return QuizJob.objects.filter(
+            status__in=[QuizJob.Status.PENDING, QuizJob.Status.RUNNING], updated_at__gte=cutoff)
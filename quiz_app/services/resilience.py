@@ -0,0 +1,112 @@
+import random
+import threading
+import time
+from collections import Counter, deque
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures, probing again after a cool-down.
+
+    closed:    calls pass; `failure_threshold` consecutive failures open the circuit
+    open:      calls raise CircuitOpenError until `reset_seconds` have passed
+    half_open: exactly one probe call passes, the others raise CircuitOpenError;
+               its success closes, its failure re-opens. A probe that never
+               reports back is replaced after another `reset_seconds`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """Raise CircuitOpenError unless the circuit is closed or this call becomes the probe."""
+
+        with self._lock:
+            if self._state == "closed":
+                return
+            now = time.monotonic()
+            if self._state == "open":
+                remaining = self.reset_seconds - (now - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f"{self.name} ist vorübergehend nicht erreichbar (erneuter Versuch in {remaining:.0f}s)")
+                self._state = "half_open"
+            elif self._probe_started is not None and now - self._probe_started < self.reset_seconds:
+                raise CircuitOpenError(f"{self.name} wird gerade erneut getestet, bitte später erneut versuchen")
+            self._probe_started = now
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._probe_started = None
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def reset(self):
+        self.record_success()
+
+
+def backoff_delays(attempts: int, base: float, cap: float):
+    """Yield the wait before each attempt: 0 first, then exponential backoff with full jitter."""
+
+    for attempt in range(attempts):
+        yield 0.0 if attempt == 0 else random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class CallMetrics:
+    """Rolling per-attempt latency samples and outcome counters for one dependency."""
+
+    def __init__(self, max_samples: int = 500):
+        self._samples = deque(maxlen=max_samples)
+        self._outcomes = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self._outcomes[outcome] += 1
+
+    def snapshot(self) -> dict:
+        """Return outcome counts and p50/p95/max latency in milliseconds."""
+
+        with self._lock:
+            samples = sorted(self._samples)
+            outcomes = dict(self._outcomes)
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 1) if samples else None
+
+        return {
+            "attempts": sum(outcomes.values()),
+            "outcomes": outcomes,
+            "p50_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+            "max_ms": round(samples[-1] * 1000, 1) if samples else None,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._outcomes.clear()
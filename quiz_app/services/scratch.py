@@ -0,0 +1,158 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+
+# Audio files written straight into the temp dir before scratch space existed.
+_LEGACY_AUDIO = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.(mp3|m4a|webm|opus|part)$")
+
+
+class ScratchSpaceFull(RuntimeError):
+    """Raised when a new download would push scratch usage over SCRATCH_QUOTA_BYTES."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ScratchSpace:
+    """Per-job scratch directories for downloaded audio, with quota and cleanup.
+
+    Every download gets its own directory under SCRATCH_DIR that is removed as
+    soon as the job is done with it, also on failure. Directories left behind
+    by crashed processes are removed by reap() (see the reap_scratch command).
+    """
+
+    _active = set()
+    _lock = threading.Lock()
+    _stats = {"created": 0, "cleaned": 0, "cleaned_bytes": 0, "reaped": 0, "reaped_bytes": 0}
+
+    @staticmethod
+    def root() -> str:
+        path = settings.SCRATCH_DIR or os.path.join(tempfile.gettempdir(), "quizly-scratch")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @classmethod
+    @contextmanager
+    def job(cls, prefix: str = "job"):
+        """Yield a fresh directory that is deleted with its contents on exit."""
+
+        path = tempfile.mkdtemp(prefix=f"{prefix}-", dir=cls.root())
+        with cls._lock:
+            cls._active.add(path)
+            cls._stats["created"] += 1
+        try:
+            yield path
+        finally:
+            size = _tree_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+            with cls._lock:
+                cls._active.discard(path)
+                cls._stats["cleaned"] += 1
+                cls._stats["cleaned_bytes"] += size
+
+    @classmethod
+    def usage(cls) -> int:
+        """Bytes currently on disk under the scratch root."""
+
+        return _tree_size(cls.root())
+
+    @staticmethod
+    def size(path: str) -> int:
+        """Bytes used by a file or directory tree (0 if it does not exist)."""
+
+        return _tree_size(path)
+
+    @classmethod
+    def ensure_capacity(cls, expected_bytes: int | None = None):
+        """Raise ScratchSpaceFull if a download of expected_bytes would exceed the quota."""
+
+        quota = settings.SCRATCH_QUOTA_BYTES
+        if quota and cls.usage() + (expected_bytes or 0) > quota:
+            raise ScratchSpaceFull(
+                "Server ist ausgelastet, bitte später erneut versuchen",
+                settings.SCRATCH_RETRY_AFTER_SECONDS)
+
+    @classmethod
+    def reap(cls, max_age_seconds: float | None = None, legacy: bool = False) -> tuple[int, int]:
+        """Delete job directories untouched for max_age_seconds.
+
+        With legacy=True, audio files named <uuid>.<ext> directly in the system
+        temp dir (written before scratch space existed) are swept as well;
+        only opt in where no other program uses that naming. Returns the
+        number of entries removed and the bytes freed. Directories in use by
+        this process are never removed.
+        """
+
+        max_age = settings.SCRATCH_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        cutoff = time.time() - max_age
+        candidates = [os.path.join(cls.root(), name) for name in os.listdir(cls.root())]
+        if legacy:
+            tmp = tempfile.gettempdir()
+            candidates += [os.path.join(tmp, name) for name in os.listdir(tmp) if _LEGACY_AUDIO.match(name)]
+
+        removed = freed = 0
+        for path in candidates:
+            with cls._lock:
+                if path in cls._active:
+                    continue
+            if _newest_mtime(path) > cutoff:
+                continue
+            size = _tree_size(path)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+            removed += 1
+            freed += size
+
+        with cls._lock:
+            cls._stats["reaped"] += removed
+            cls._stats["reaped_bytes"] += freed
+        return removed, freed
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Return bytes in flight, active directories, quota and cleanup counters."""
+
+        with cls._lock:
+            snapshot = {**cls._stats, "active_dirs": len(cls._active)}
+        return {**snapshot, "bytes_in_flight": cls.usage(), "quota_bytes": settings.SCRATCH_QUOTA_BYTES}
+
+
+def _tree_size(path) -> int:
+    if os.path.isfile(path):
+        return _size(path)
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        total += sum(_size(os.path.join(dirpath, f)) for f in filenames)
+    return total
+
+
+def _size(path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _newest_mtime(path) -> float:
+    try:
+        newest = os.path.getmtime(path)
+    except OSError:
+        return 0.0
+    for dirpath, _, filenames in os.walk(path):
+        for f in filenames:
+            try:
+                newest = max(newest, os.path.getmtime(os.path.join(dirpath, f)))
+            except OSError:
+                pass
+    return newest
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process coalescing is available
+    fcntl = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution.
+
+    Within a process, the first caller (the leader) runs the function while
+    later callers for the same key wait for and share its result. Across
+    processes, leaders serialize on an exclusive file lock per key, so a
+    second process waits for the first and can then find its cached result.
+    """
+
+    _calls = {}
+    _lock = threading.Lock()
+    _stats = {"leaders": 0, "followers": 0}
+
+    @staticmethod
+    def do(key: str, fn, on_wait=None):
+        """Return fn() for the leader, or the leader's result for concurrent followers."""
+
+        with SingleFlight._lock:
+            future = SingleFlight._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                SingleFlight._calls[key] = future
+            SingleFlight._stats["leaders" if leader else "followers"] += 1
+
+        if not leader:
+            if on_wait:
+                on_wait()
+            return future.result()
+
+        try:
+            with SingleFlight._process_lock(key, on_wait):
+                result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with SingleFlight._lock:
+                SingleFlight._calls.pop(key, None)
+
+    @staticmethod
+    def stats() -> dict:
+        """Return how many calls led an execution and how many were coalesced."""
+
+        with SingleFlight._lock:
+            return {**SingleFlight._stats, "in_flight": len(SingleFlight._calls)}
+
+    @staticmethod
+    @contextmanager
+    def _process_lock(key, on_wait=None):
+        if fcntl is None:
+            yield
+            return
+
+        lock_dir = settings.SINGLE_FLIGHT_LOCK_DIR or os.path.join(
+            tempfile.gettempdir(), "quizly-locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        path = os.path.join(lock_dir, hashlib.sha1(key.encode()).hexdigest() + ".lock")
+
+        with open(path, "a") as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                if on_wait:
+                    on_wait()
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
@@ -0,0 +1,109 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("pipeline_trace", default=None)
+_open_stage = contextvars.ContextVar("pipeline_stage", default=None)
+
+
+class PipelineTrace:
+    """Stage durations, sizes and counters collected during one quiz generation.
+
+    Services call the module-level stage()/record()/incr() helpers, which are
+    no-ops unless a trace is active in the current context (see trace()).
+    Stages record self time: a stage nested in another (decode inside
+    download, model_load inside transcription) is subtracted from its
+    parent, so the per-stage totals never add up to more than the run.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.values = {}
+        self.failed_stage = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage; the first stage an exception escapes from is remembered."""
+
+        parent = _open_stage.get()
+        frame = {"trace": self, "nested": 0.0}
+        token = _open_stage.set(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            if self.failed_stage is None:
+                self.failed_stage = name
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            _open_stage.reset(token)
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - frame["nested"]
+            if parent is not None and parent["trace"] is self:
+                parent["nested"] += elapsed
+
+    def as_dict(self) -> dict:
+        data = {
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "stages": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            **self.values,
+        }
+        if self.failed_stage:
+            data["failed_stage"] = self.failed_stage
+        return data
+
+
+@contextmanager
+def trace():
+    """Activate a new PipelineTrace for the current context and yield it."""
+
+    pipeline = PipelineTrace()
+    token = _current.set(pipeline)
+    try:
+        yield pipeline
+    finally:
+        _current.reset(token)
+
+
+def current() -> PipelineTrace | None:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    pipeline = _current.get()
+    if pipeline is None:
+        yield
+        return
+    with pipeline.stage(name):
+        yield
+
+
+def record(**values):
+    """Set values (sizes, labels) on the active trace."""
+
+    pipeline = _current.get()
+    if pipeline is not None:
+        pipeline.values.update(values)
+
+
+def incr(key: str, amount=1):
+    """Add to a counter on the active trace."""
+
+    pipeline = _current.get()
+    if pipeline is not None:
+        pipeline.values[key] = pipeline.values.get(key, 0) + amount
+
+
+def summarize(samples) -> dict:
+    """Return count, p50, p95 and max of a list of numbers."""
+
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "p50": None, "p95": None, "max": None}
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    return {"count": len(ordered), "p50": pct(0.5), "p95": pct(0.95), "max": ordered[-1]}
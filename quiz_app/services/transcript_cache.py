@@ -0,0 +1,92 @@
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from quiz_app.models import Transcript
+
+
+class TranscriptCache:
+    """Persistent transcript store keyed by YouTube video id and Whisper model."""
+
+    _stats = {"hits": 0, "misses": 0}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(video_id: str, model_name: str | None = None) -> Transcript | None:
+        """Return a fresh cached transcript and mark it as used, or None."""
+
+        model_name = model_name or settings.WHISPER_MODEL
+        entry = (Transcript.objects
+                 .filter(video_id=video_id, model_name=model_name,
+                         last_used_at__gte=TranscriptCache._expiry_cutoff())
+                 .first())
+
+        TranscriptCache._count("hits" if entry else "misses")
+        if entry:
+            Transcript.objects.filter(pk=entry.pk).update(
+                hits=F("hits") + 1, last_used_at=timezone.now())
+        return entry
+
+    @staticmethod
+    def has(video_id: str, model_name: str | None = None) -> bool:
+        """Return whether a fresh transcript exists, without counting it as a lookup."""
+
+        return Transcript.objects.filter(
+            video_id=video_id, model_name=model_name or settings.WHISPER_MODEL,
+            last_used_at__gte=TranscriptCache._expiry_cutoff()).exists()
+
+    @staticmethod
+    def store(video_id: str, text: str, info: dict, model_name: str | None = None) -> Transcript:
+        """Save a transcript for later requests and evict stale entries."""
+
+        model_name = model_name or settings.WHISPER_MODEL
+        defaults = {
+            "text": text,
+            "title": (info.get("title") or "")[:255],
+            "last_used_at": timezone.now(),
+        }
+        entry, _ = Transcript.objects.update_or_create(
+            video_id=video_id, model_name=model_name, defaults=defaults)
+
+        TranscriptCache.evict()
+        return entry
+
+    @staticmethod
+    def evict() -> int:
+        """Delete expired entries and the least recently used ones beyond the size limit."""
+
+        deleted, _ = Transcript.objects.filter(
+            last_used_at__lt=TranscriptCache._expiry_cutoff()).delete()
+
+        max_entries = settings.TRANSCRIPT_CACHE_MAX_ENTRIES
+        overflow = Transcript.objects.count() - max_entries
+        if overflow > 0:
+            stale_ids = list(Transcript.objects.order_by("last_used_at", "id")
+                             .values_list("id", flat=True)[:overflow])
+            deleted += Transcript.objects.filter(id__in=stale_ids).delete()[0]
+
+        return deleted
+
+    @staticmethod
+    def stats() -> dict:
+        """Return process-local hit/miss counters, hit rate and current entry count."""
+
+        with TranscriptCache._lock:
+            hits, misses = TranscriptCache._stats["hits"], TranscriptCache._stats["misses"]
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": Transcript.objects.count(),
+        }
+
+    @staticmethod
+    def _count(key):
+        with TranscriptCache._lock:
+            TranscriptCache._stats[key] += 1
+
+    @staticmethod
+    def _expiry_cutoff():
+        return timezone.now() - timedelta(days=settings.TRANSCRIPT_CACHE_MAX_AGE_DAYS)
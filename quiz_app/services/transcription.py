@@ -1,13 +1,121 @@
-import whisper
+import threading
+import time
+from django.conf import settings
+from . import tracing
+
+
+class WhisperModelRegistry:
+    """Process-wide cache of loaded Whisper models keyed by model name and device.
+
+    A Whisper model must not decode from several threads at once: every
+    decode installs KV-cache hooks on the shared decoder modules. transcribe()
+    therefore serializes inference per model; run more processes (chunk pool,
+    transcription workers) for parallel transcription.
+    """
+
+    _models = {}
+    _inference_locks = {}
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "misses": 0, "load_seconds": 0.0, "inference_wait_seconds": 0.0}
+
+    @classmethod
+    def get(cls, name: str | None = None, device: str | None = None):
+        """Return a loaded Whisper model, loading it once per process on first use."""
+
+        key = (name or settings.WHISPER_MODEL, device or settings.WHISPER_DEVICE)
+
+        with cls._lock:
+            model = cls._models.get(key)
+            if model is not None:
+                cls._stats["hits"] += 1
+                return model
+
+            # Imported here: whisper pulls in torch, which costs seconds at startup.
+            import whisper
+
+            started = time.perf_counter()
+            with tracing.stage("model_load"):
+                model = whisper.load_model(key[0], device=key[1])
+            cls._stats["load_seconds"] += time.perf_counter() - started
+            cls._stats["misses"] += 1
+            cls._models[key] = model
+            cls._inference_locks[key] = threading.Lock()
+            return model
+
+    @classmethod
+    def transcribe(cls, audio, name: str | None = None, device: str | None = None) -> dict:
+        """Run model.transcribe(audio) while holding the model's inference lock."""
+
+        model = cls.get(name, device)
+        key = (name or settings.WHISPER_MODEL, device or settings.WHISPER_DEVICE)
+        with cls._lock:
+            inference_lock = cls._inference_locks.setdefault(key, threading.Lock())
+
+        started = time.perf_counter()
+        with inference_lock:
+            waited = time.perf_counter() - started
+            with cls._lock:
+                cls._stats["inference_wait_seconds"] += waited
+            return model.transcribe(audio)
+
+    @classmethod
+    def warm_up(cls, names=None, device: str | None = None) -> dict:
+        """Load the given models (default: the configured one) and return load times."""
+
+        timings = {}
+        for name in names or [settings.WHISPER_MODEL]:
+            started = time.perf_counter()
+            cls.get(name, device)
+            timings[name] = time.perf_counter() - started
+        return timings
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Return hit/miss counters, cumulative load time and loaded model keys."""
+
+        with cls._lock:
+            return {**cls._stats, "loaded": [f"{n}@{d or 'auto'}" for n, d in cls._models]}
+
+    @classmethod
+    def clear(cls):
+        """Drop all cached models and reset the counters."""
+
+        with cls._lock:
+            cls._models.clear()
+            cls._inference_locks.clear()
+            cls._stats.update(hits=0, misses=0, load_seconds=0.0, inference_wait_seconds=0.0)
+
 
 class TranscriptionService:
 
     """Service to transcribe audio files into text using Whisper."""
 
     @staticmethod
-    def transcribe(audio_file: str) -> str:
-        """Transcribe an audio file to plain text using the 'tiny' Whisper model."""
+    def transcribe(audio) -> str:
+        """Transcribe an audio file path or 16 kHz PCM array to plain text.
+
+        Runs on the transcription worker when TRANSCRIPTION_WORKER_ADDRESS is
+        set, so this process never loads Whisper; otherwise runs in-process.
+        """
+
+        if settings.TRANSCRIPTION_WORKER_ADDRESS:
+            from .transcription_worker import TranscriptionWorkerClient
+
+            return TranscriptionWorkerClient.transcribe(audio)
+        return TranscriptionService.transcribe_local(audio)
+
+    @staticmethod
+    def transcribe_local(audio) -> str:
+        """Transcribe in this process using the cached Whisper model."""
+
+        if settings.WHISPER_CHUNK_MIN_SECONDS:
+            from .audio import SAMPLE_RATE, decode_audio
+            from .chunked_transcription import ChunkedTranscriber
+
+            if isinstance(audio, str):
+                with tracing.stage("decode"):
+                    audio = decode_audio(audio)
+            if len(audio) > settings.WHISPER_CHUNK_MIN_SECONDS * SAMPLE_RATE:
+                return ChunkedTranscriber.transcribe(audio)
 
-        model = whisper.load_model("tiny")
-        result = model.transcribe(audio_file)
-        return result["text"]
+        return WhisperModelRegistry.transcribe(audio)["text"]
@@ -0,0 +1,145 @@
+import itertools
+import threading
+from multiprocessing.connection import Client, Listener
+from django.conf import settings
+
+
+def parse_address(address: str):
+    """Turn "host:port" into a TCP address tuple; anything else is a Unix socket path."""
+
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def _authkey() -> bytes:
+    return (settings.TRANSCRIPTION_WORKER_AUTHKEY or settings.SECRET_KEY).encode()
+
+
+class TranscriptionWorker:
+    """Standalone process that owns the Whisper model and transcribes on request.
+
+    Web workers send ("transcribe", path_or_pcm) over an authenticated
+    multiprocessing connection and receive ("ok", text) or ("error", message).
+    At most `concurrency` transcriptions run at once; further requests wait.
+    Inference on the shared model is serialized, so extra concurrency only
+    overlaps audio decoding; start more workers for parallel inference.
+    """
+
+    def __init__(self, address: str, concurrency: int = 1):
+        self.listener = Listener(parse_address(address), authkey=_authkey())
+        self.slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._stats = {"served": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def serve_forever(self):
+        """Accept connections until close() is called, one handler thread each."""
+
+        while True:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                # Listener closed.
+                return
+            except Exception:
+                # Failed handshake (wrong authkey); keep serving others.
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def close(self):
+        self.listener.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _handle(self, conn):
+        from .transcription import TranscriptionService
+
+        with conn:
+            try:
+                command, payload = conn.recv()
+            except (EOFError, OSError, ValueError):
+                return
+
+            if command == "ping":
+                conn.send(("ok", "pong"))
+                return
+            if command != "transcribe":
+                conn.send(("error", f"Unknown command: {command}"))
+                return
+
+            try:
+                with self.slots:
+                    text = TranscriptionService.transcribe_local(payload)
+            except Exception as e:
+                self._count("failed")
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+                return
+
+            self._count("served")
+            conn.send(("ok", text))
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+
+class TranscriptionWorkerClient:
+    """Sends transcription requests to the worker(s) in TRANSCRIPTION_WORKER_ADDRESS.
+
+    Several comma-separated addresses are used round-robin; an unreachable
+    worker is skipped in favour of the next one.
+    """
+
+    _counter = itertools.count()
+
+    @staticmethod
+    def addresses() -> list:
+        return [a.strip() for a in settings.TRANSCRIPTION_WORKER_ADDRESS.split(",") if a.strip()]
+
+    @staticmethod
+    def transcribe(audio) -> str:
+        """Transcribe an audio file path (on a shared filesystem) or PCM array remotely."""
+
+        status, result = TranscriptionWorkerClient._request(("transcribe", audio))
+        if status != "ok":
+            raise RuntimeError(f"Transkription fehlgeschlagen: {result}")
+        return result
+
+    @staticmethod
+    def ping() -> bool:
+        try:
+            return TranscriptionWorkerClient._request(("ping", None)) == ("ok", "pong")
+        except RuntimeError:
+            return False
+
+    @staticmethod
+    def _request(message):
+        addresses = TranscriptionWorkerClient.addresses()
+        start = next(TranscriptionWorkerClient._counter)
+        last_error = None
+
+        for i in range(len(addresses)):
+            address = addresses[(start + i) % len(addresses)]
+            try:
+                conn = Client(parse_address(address), authkey=_authkey())
+            except OSError as e:
+                last_error = e
+                continue
+
+            with conn:
+                conn.send(message)
+                if not conn.poll(settings.TRANSCRIPTION_WORKER_TIMEOUT_SECONDS):
+                    raise RuntimeError("Transkription: Zeitüberschreitung")
+                try:
+                    return conn.recv()
+                except EOFError as e:
+                    raise RuntimeError("Transkriptions-Worker hat die Verbindung beendet") from e
+
+        raise RuntimeError("Kein Transkriptions-Worker erreichbar") from last_error
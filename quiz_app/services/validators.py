@@ -1,22 +1,48 @@
-def is_valid_quiz_payload(data) -> bool:
-    """Check if quiz data is valid: list of 10 dicts with 4 unique options and a correct answer."""
+QUESTIONS_PER_QUIZ = 10
+
 
-    if not isinstance(data, list) or len(data) != 10:
+def is_valid_question(q) -> bool:
+    """Check a single question: a title, 4 unique options and an answer among them."""
+
+    if not isinstance(q, dict):
         return False
 
+    title = q.get("question_title")
+    options = q.get("question_options", [])
+    answer = q.get("answer")
+
+    return (
+        isinstance(title, str)
+        and bool(title.strip())
+        and isinstance(options, list)
+        and len(options) == 4
+        and len(set(map(str, options))) == 4
+        and answer in options
+    )
+
+
+def valid_questions(data) -> list:
+    """Return the valid questions from a payload, dropping invalid items and repeated titles."""
+
+    if not isinstance(data, list):
+        return []
+
+    kept, seen = [], set()
     for q in data:
-        if not isinstance(q, dict):
-            return False
+        if not is_valid_question(q):
+            continue
+        key = q["question_title"].strip().lower()
+        if key not in seen:
+            seen.add(key)
+            kept.append(q)
+    return kept
 
-        options = q.get("question_options", [])
-        answer = q.get("answer")
 
-        if (
-            not isinstance(options, list)
-            or len(options) != 4
-            or len(set(options)) != 4
-            or answer not in options
-        ):
-            return False
+def is_valid_quiz_payload(data) -> bool:
+    """Check if quiz data is valid: list of 10 dicts with 4 unique options and a correct answer."""
 
-    return True
+    return (
+        isinstance(data, list)
+        and len(data) == QUESTIONS_PER_QUIZ
+        and all(is_valid_question(q) for q in data)
+    )
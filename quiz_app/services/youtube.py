@@ -1,40 +1,135 @@
-import yt_dlp
 import tempfile
 import uuid
 import os
+from django.conf import settings
+from django.core.cache import cache
+
+from . import tracing
+
+
+class VideoRejectedError(RuntimeError):
+    """Raised when a video is unavailable or exceeds the configured limits."""
+
 
 class YouTubeService:
-    """Service to download audio from YouTube videos as MP3 with metadata."""
+    """Service to fetch audio from YouTube videos together with their metadata.
+
+    YOUTUBE_AUDIO_MODE controls how audio reaches Whisper:
+        - "native": download the best audio stream as-is, no re-encode (default)
+        - "stream": pipe the remote stream through ffmpeg straight into PCM, no temp file
+        - "mp3":    legacy behaviour, transcode the download to a 192 kbps MP3
+    """
 
 
     @staticmethod
-    def download_audio(url: str) -> tuple[str, dict]:
-        """Download a YouTube video's audio as MP3 and return file path and metadata."""
+    def probe(url: str, video_id: str) -> dict:
+        """Fetch metadata only (no download), cached by video id, and enforce duration/size limits."""
+
+        key = f"youtube:probe:{video_id}"
+        meta = cache.get(key)
+
+        if meta is None:
+            import yt_dlp
+
+            ydl_opts = {
+                "format": "bestaudio[ext=m4a]/bestaudio/best",
+                "quiet": True,
+                "noplaylist": True,
+            }
+            try:
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    info = ydl.extract_info(url, download=False)
+            except yt_dlp.utils.DownloadError as e:
+                raise VideoRejectedError("Video nicht verfügbar") from e
+
+            meta = {
+                "title": info.get("title"),
+                "duration": info.get("duration"),
+                "filesize": info.get("filesize") or info.get("filesize_approx"),
+                "is_live": bool(info.get("is_live")),
+            }
+            cache.set(key, meta, settings.YOUTUBE_PROBE_CACHE_SECONDS)
+
+        YouTubeService._check_limits(meta)
+        return meta
+
+    @staticmethod
+    def _check_limits(meta):
+        if meta["is_live"]:
+            raise VideoRejectedError("Livestreams werden nicht unterstützt")
+
+        max_duration = settings.YOUTUBE_MAX_DURATION_SECONDS
+        if max_duration and (meta["duration"] or 0) > max_duration:
+            raise VideoRejectedError(
+                f"Video ist zu lang (maximal {max_duration // 60} Minuten)")
+
+        max_filesize = settings.YOUTUBE_MAX_FILESIZE_BYTES
+        if max_filesize and (meta["filesize"] or 0) > max_filesize:
+            raise VideoRejectedError(
+                f"Audiodatei ist zu groß (maximal {max_filesize // 1_000_000} MB)")
+
+    @staticmethod
+    def download_audio(url: str, target_dir: str | None = None) -> tuple[str, dict]:
+        """Download a YouTube video's audio into target_dir and return file path and metadata.
+
+        Callers own target_dir and its cleanup (see ScratchSpace.job); without
+        one the file lands in the system temp dir.
+        """
 
-        tmp_dir = tempfile.gettempdir()
-        filename = os.path.join(tmp_dir, f"{uuid.uuid4()}.%(ext)s")
+        import yt_dlp
+
+        filename = os.path.join(target_dir or tempfile.gettempdir(), f"{uuid.uuid4()}.%(ext)s")
+        legacy_mp3 = settings.YOUTUBE_AUDIO_MODE == "mp3"
 
         ydl_opts = {
             "format": "bestaudio[ext=m4a]/bestaudio/best",
             "outtmpl": filename,
             "quiet": True,
             "noplaylist": True,
-            "postprocessors": [{
+        }
+        if legacy_mp3:
+            ydl_opts["postprocessors"] = [{
                 "key": "FFmpegExtractAudio",
                 "preferredcodec": "mp3",
                 "preferredquality": "192",
-            }],
-        }
+            }]
 
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=True)
-            audio_file = (
-                ydl.prepare_filename(info)
-                .replace(".webm", ".mp3")
-                .replace(".m4a", ".mp3")
-            )
+            if legacy_mp3:
+                audio_file = (
+                    ydl.prepare_filename(info)
+                    .replace(".webm", ".mp3")
+                    .replace(".m4a", ".mp3")
+                )
+            else:
+                downloads = info.get("requested_downloads") or [{}]
+                audio_file = downloads[0].get("filepath") or ydl.prepare_filename(info)
 
         if not os.path.exists(audio_file):
             raise RuntimeError("Audio-Download fehlgeschlagen")
 
         return audio_file, info
+
+    @staticmethod
+    def stream_audio(url: str):
+        """Decode a YouTube video's audio stream directly to 16 kHz PCM and return it with metadata."""
+
+        import yt_dlp
+        from .audio import decode_audio
+
+        ydl_opts = {
+            "format": "bestaudio[ext=m4a]/bestaudio/best",
+            "quiet": True,
+            "noplaylist": True,
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+
+        stream_url = info.get("url")
+        if not stream_url:
+            raise RuntimeError("Audio-Stream nicht verfügbar")
+
+        with tracing.stage("decode"):
+            return decode_audio(stream_url, headers=info.get("http_headers")), info
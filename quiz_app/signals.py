@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .api.caching import QuizResponseCache
+from .models import Quiz, Question
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def invalidate_quiz_responses(sender, instance, **kwargs):
+    """Drop the owner's cached quiz responses when a quiz is created, changed or deleted."""
+
+    QuizResponseCache.invalidate(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question_responses(sender, instance, **kwargs):
+    """Drop the owner's cached quiz responses when one of the quiz's questions changes."""
+
+    user_id = Quiz.objects.filter(pk=instance.quiz_id).values_list("user_id", flat=True).first()
+    if user_id is not None:
+        QuizResponseCache.invalidate(user_id)
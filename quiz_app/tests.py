@@ -1,13 +1,64 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.db import connection
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from quiz_app.models import Quiz, Question
-from unittest.mock import patch
+from quiz_app.models import Quiz, Question, QuizJob, Transcript
+from quiz_app.services.quiz_creator import QuizCreator
+from quiz_app.api.serializers import QuizSerializer, QuizSummarySerializer, QuizReadSerializer
+from rest_framework.renderers import JSONRenderer
+from quiz_app.services.transcript_cache import TranscriptCache
+from quiz_app.services.single_flight import SingleFlight
+from quiz_app.services.youtube import YouTubeService, VideoRejectedError
+from quiz_app.services.scratch import ScratchSpace
+from quiz_app.services import tracing
+from quiz_app.services.jobs import QuizJobQueue
+from quiz_app.services.quotas import JobQuota
+from quiz_app.management.commands import process_quiz_jobs
+from quiz_app.services.chunked_transcription import split_audio, stitch_texts, ChunkedTranscriber
+from quiz_app.services.gemini import GeminiQuizService, QuizAssembly
+from quiz_app.services.llm_backends import FakeBackend, get_backend, reset_backends, select_backends
+from quiz_app.services.prompts import build_quiz_prompt
+from quiz_app.services.validators import valid_questions
+from quiz_app.services.parsing import iter_json_array_items
+from quiz_app.services.resilience import CircuitBreaker, CircuitOpenError
+from google.genai import errors as genai_errors
+from quiz_app.services.condense import condense_transcript, estimate_tokens
+from unittest.mock import patch, MagicMock, AsyncMock
+from rest_framework_simplejwt.tokens import AccessToken
+from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from datetime import timedelta
+from django.utils import timezone
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+from quiz_app.services.transcription import WhisperModelRegistry, TranscriptionService
+from quiz_app.services.transcription_worker import TranscriptionWorker, TranscriptionWorkerClient
 
 User = get_user_model()
 
 
+def fake_questions(count=10):
+    return [
+        {
+            "question_title": f"Question {i}?",
+            "question_options": ["A", "B", "C", "D"],
+            "answer": "A",
+        }
+        for i in range(count)
+    ]
+
+
 class QuizTests(TestCase):
     """Test CRUD operations for Quiz and Question endpoints."""
 
@@ -17,10 +68,15 @@ class QuizTests(TestCase):
             username="quizuser", email="quiz@example.com", password="pass123"
         )
         self.client.force_authenticate(user=self.user)
+        probe = patch("quiz_app.services.youtube.YouTubeService.probe", return_value={"duration": 300})
+        probe.start()
+        self.addCleanup(probe.stop)
+        cache.clear()
 
+    @override_settings(QUIZ_JOBS_MODE="eager")
     @patch("quiz_app.services.quiz_creator.QuizCreator.create")
     def test_create_quiz_success(self, mock_create):
-        """Create a new quiz successfully."""
+        """Create a new quiz successfully through a background job."""
         # Mock the QuizCreator to avoid actual YouTube download & Whisper
         quiz = Quiz.objects.create(
             user=self.user,
@@ -37,9 +93,19 @@ class QuizTests(TestCase):
         mock_create.return_value = quiz
 
         response = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/testvideo"})
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.data["title"], "Test Quiz")
-        self.assertEqual(len(response.data["questions"]), 1)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], QuizJob.Status.SUCCEEDED)
+
+        response = self.client.get(f"/api/jobs/{response.data['id']}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["quiz"]["title"], "Test Quiz")
+        self.assertEqual(len(response.data["quiz"]["questions"]), 1)
+
+    def test_create_quiz_invalid_url(self):
+        """Reject URLs that are not YouTube links before queueing a job."""
+        response = self.client.post("/api/createQuiz/", {"url": "https://example.com/video"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(QuizJob.objects.exists())
 
     def test_list_quizzes(self):
         """List all quizzes of the authenticated user."""
@@ -54,6 +120,41 @@ class QuizTests(TestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["title"], "My Quiz")
 
+    def _create_quizzes(self, count):
+        for i in range(count):
+            quiz = Quiz.objects.create(
+                user=self.user, title=f"Quiz {i}", video_url=f"https://youtu.be/list{i}")
+            Question.objects.bulk_create(
+                Question(quiz=quiz, question_title=q["question_title"],
+                         question_options=q["question_options"], answer=q["answer"])
+                for q in fake_questions()
+            )
+
+    def test_list_query_count_is_constant(self):
+        """Listing uses one query for quizzes and one for all their questions."""
+        self._create_quizzes(5)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/quizzes/")
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(response.data[0]["questions"]), 10)
+
+    def test_list_cursor_pagination(self):
+        """With page_size the list is paginated newest first via cursors."""
+        self._create_quizzes(3)
+        response = self.client.get("/api/quizzes/", {"page_size": 2})
+        self.assertEqual([q["title"] for q in response.data["results"]], ["Quiz 2", "Quiz 1"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([q["title"] for q in response.data["results"]], ["Quiz 0"])
+        self.assertIsNone(response.data["next"])
+
+    def test_list_summary_mode(self):
+        """Summary mode omits nested questions and skips the questions query."""
+        self._create_quizzes(2)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/quizzes/", {"summary": "true"})
+        self.assertNotIn("questions", response.data[0])
+
     def test_quiz_detail_retrieve(self):
         """Retrieve a single quiz with questions."""
         quiz = Quiz.objects.create(
@@ -98,4 +199,1186 @@ class QuizTests(TestCase):
         )
         response = self.client.delete(f"/api/quizzes/{quiz.id}/")
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(Quiz.objects.filter(id=quiz.id).exists())
\ No newline at end of file
+        self.assertFalse(Quiz.objects.filter(id=quiz.id).exists())
+
+
+@override_settings(QUIZ_RESPONSE_CACHE_SECONDS=300)
+class QuizResponseCacheTests(TestCase):
+    """Test cached quiz responses, conditional requests and invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="cacheuser", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        self.quiz = Quiz.objects.create(user=self.user, title="Cached", video_url="https://youtu.be/c")
+        Question.objects.create(quiz=self.quiz, question_title="Q1", question_options=["A", "B", "C", "D"], answer="A")
+        self.url = f"/api/quizzes/{self.quiz.id}/"
+
+    def test_detail_served_from_cache_with_validators(self):
+        """Repeated reads skip the database; matching validators return 304."""
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_and_question_changes_invalidate(self):
+        """Edits through the detail view and question changes are visible immediately."""
+        etag = self.client.get(self.url)["ETag"]
+
+        self.client.patch(self.url, {"title": "Renamed"}, format="json")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Renamed")
+
+        Question.objects.create(quiz=self.quiz, question_title="Q2", question_options=["A", "B", "C", "D"], answer="B")
+        self.assertEqual(len(self.client.get(self.url).data["questions"]), 2)
+        self.assertEqual(len(self.client.get("/api/quizzes/").data[0]["questions"]), 2)
+
+    def test_list_invalidated_on_delete(self):
+        """Deleting a quiz clears the cached list even for If-Modified-Since requests."""
+        listed = self.client.get("/api/quizzes/")
+        self.assertEqual(len(listed.data), 1)
+
+        # HTTP dates have one-second resolution; delete "a few seconds later".
+        with patch("quiz_app.api.caching.time.time", return_value=time.time() + 5):
+            self.client.delete(self.url)
+        response = self.client.get("/api/quizzes/", HTTP_IF_MODIFIED_SINCE=listed["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    @override_settings(QUIZ_RESPONSE_CACHE_SECONDS=0)
+    def test_disabled_cache_still_answers_etag(self):
+        """Without the response cache every read hits the database but ETags still give 304."""
+        first = self.client.get(self.url)
+        self.assertNotIn("Last-Modified", first)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(self.url, {"title": "Renamed"}, format="json")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code,
+                         status.HTTP_200_OK)
+
+    def test_cached_detail_not_served_to_other_users(self):
+        """Another user never receives the owner's cached response."""
+        self.client.get(self.url)
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username="intruder", password="pass123"))
+        self.assertEqual(other.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class QuizReadSerializerTests(TestCase):
+    """Test that the read fast path matches QuizSerializer byte for byte."""
+
+    def setUp(self):
+        user = User.objects.create_user(username="fastpath", password="pass123")
+        for i, description in enumerate([None, "", "Beschreibung mit Umlauten äöü"]):
+            quiz = Quiz.objects.create(
+                user=user, title=f"Quiz „{i}“", description=description, video_url=f"https://youtu.be/f{i}")
+            for q in fake_questions(i * 4):
+                Question.objects.create(quiz=quiz, question_title=q["question_title"],
+                                        question_options=q["question_options"] + ["\"quoted\""], answer=q["answer"])
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_many_matches_model_serializers(self):
+        """Lists with and without questions render to identical bytes."""
+        quizzes = Quiz.objects.order_by("-created_at", "-id")
+        rows = quizzes.values(*QuizReadSerializer.QUIZ_FIELDS)
+
+        self.assertEqual(
+            self.render(QuizReadSerializer.many(rows)),
+            self.render(QuizSerializer(quizzes.prefetch_related("questions"), many=True).data))
+        self.assertEqual(
+            self.render(QuizReadSerializer.many(rows, with_questions=False)),
+            self.render(QuizSummarySerializer(quizzes, many=True).data))
+
+    def test_one_matches_model_serializer(self):
+        """A single prefetched quiz renders to identical bytes."""
+        for quiz in Quiz.objects.prefetch_related("questions"):
+            self.assertEqual(self.render(QuizReadSerializer.one(quiz)), self.render(QuizSerializer(quiz).data))
+
+
+class QuizJobTests(TestCase):
+    """Test the background quiz generation job queue."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="jobuser", email="job@example.com", password="pass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        probe = patch("quiz_app.services.youtube.YouTubeService.probe", return_value={"duration": 300})
+        self.probe = probe.start()
+        self.addCleanup(probe.stop)
+
+    @override_settings(QUIZ_JOBS_MODE="eager")
+    @patch("quiz_app.services.quiz_creator.QuizCreator.create")
+    def test_failed_job_reports_error(self, mock_create):
+        """A failing pipeline marks the job as failed with the error message."""
+        def fail(user, url, on_stage):
+            on_stage("transcribing", 40)
+            raise RuntimeError("Audio-Download fehlgeschlagen")
+        mock_create.side_effect = fail
+
+        response = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/abc"})
+        job = QuizJob.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, QuizJob.Status.FAILED)
+        self.assertEqual(job.stage, "transcribing")
+        self.assertEqual(job.error, "Audio-Download fehlgeschlagen")
+
+    @override_settings(QUIZ_JOBS_MODE="db")
+    @patch("quiz_app.services.quiz_creator.QuizCreator.create")
+    def test_db_queue_processed_by_command(self, mock_create):
+        """In db mode jobs stay pending until the worker command claims them."""
+        quiz = Quiz.objects.create(
+            user=self.user, title="Queued", video_url="https://youtu.be/abc")
+        mock_create.return_value = quiz
+
+        response = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/abc"})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], QuizJob.Status.PENDING)
+        mock_create.assert_not_called()
+
+        call_command("process_quiz_jobs", "--once", stdout=StringIO())
+
+        job = QuizJob.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, QuizJob.Status.SUCCEEDED)
+        self.assertEqual(job.quiz, quiz)
+
+    @override_settings(QUIZ_JOBS_MODE="db", QUIZ_LONG_VIDEO_SECONDS=600)
+    def test_duration_recorded_and_routes_lanes(self):
+        """The probed duration is stored and decides the job's scheduling lane."""
+        self.probe.return_value = {"duration": 3600}
+        long_id = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/long"}).data["id"]
+        self.probe.return_value = {"duration": 120}
+        short_id = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/short"}).data["id"]
+
+        self.assertEqual(QuizJob.objects.get(pk=long_id).duration, 3600)
+        self.assertEqual(QuizJobQueue.next_pending_id("long"), long_id)
+        self.assertEqual(QuizJobQueue.next_pending_id("short"), short_id)
+
+    @override_settings(QUIZ_JOBS_MODE="eager")
+    @patch("quiz_app.services.quiz_creator.QuizCreator._load_transcript",
+           side_effect=RuntimeError("Audio-Download fehlgeschlagen"))
+    def test_failed_job_leaves_no_quiz(self, mock_load):
+        """A job that fails before saving does not leave an empty quiz in the user's list."""
+        response = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/abc"})
+
+        self.assertEqual(response.data["status"], QuizJob.Status.FAILED)
+        self.assertFalse(Quiz.objects.filter(user=self.user).exists())
+
+    def test_worker_command_refills_slots_as_jobs_finish(self):
+        """With --workers 2 a long job does not hold back the queued jobs behind it."""
+        long_job, *short_jobs = [
+            QuizJob.objects.create(user=self.user, video_url=f"https://youtu.be/{n}") for n in range(3)]
+        shorts_done, finished = threading.Event(), []
+
+        def execute(command, job_id):
+            if job_id == long_job.pk:
+                # Only finishes if both short jobs ran while it was still running.
+                self.assertTrue(shorts_done.wait(5))
+            else:
+                finished.append(job_id)
+                if len(finished) == len(short_jobs):
+                    shorts_done.set()
+            return job_id
+
+        with patch.object(process_quiz_jobs.Command, "_execute", autospec=True, side_effect=execute):
+            call_command("process_quiz_jobs", "--once", "--workers", "2", stdout=StringIO())
+
+        self.assertEqual(sorted(finished), sorted(job.pk for job in short_jobs))
+
+    def _age(self, job, seconds):
+        QuizJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+    @override_settings(QUIZ_JOBS_MODE="thread", QUIZ_JOB_TIMEOUT_SECONDS=3600, QUIZ_JOB_REQUEUE_SECONDS=300)
+    @patch("quiz_app.services.jobs.QuizJobQueue._submit")
+    def test_recover_orphaned_jobs(self, mock_submit):
+        """After a restart stuck running jobs fail and orphaned queued jobs are resubmitted."""
+        stuck = QuizJob.objects.create(user=self.user, video_url="https://youtu.be/a", status=QuizJob.Status.RUNNING)
+        busy = QuizJob.objects.create(user=self.user, video_url="https://youtu.be/b", status=QuizJob.Status.RUNNING)
+        orphan = QuizJob.objects.create(user=self.user, video_url="https://youtu.be/c", duration=60)
+        fresh = QuizJob.objects.create(user=self.user, video_url="https://youtu.be/d")
+        probing = QuizJob.objects.create(user=self.user, video_url="https://youtu.be/e", stage="probing")
+        self._age(stuck, 7200)
+        self._age(busy, 60)
+        self._age(orphan, 600)
+        self._age(probing, 600)
+
+        result = QuizJobQueue.recover()
+
+        self.assertEqual(result, {"timed_out": 1, "abandoned": 1, "requeued": 1})
+        mock_submit.assert_called_once_with(orphan.pk, False)
+        statuses = dict(QuizJob.objects.values_list("id", "status"))
+        self.assertEqual(statuses[stuck.pk], QuizJob.Status.FAILED)
+        self.assertEqual(statuses[busy.pk], QuizJob.Status.RUNNING)
+        self.assertEqual(statuses[fresh.pk], QuizJob.Status.PENDING)
+        self.assertEqual(statuses[probing.pk], QuizJob.Status.FAILED)
+
+    @override_settings(QUIZ_JOBS_MODE="thread")
+    @patch("quiz_app.services.jobs.QuizJobQueue._submit")
+    def test_recover_skips_jobs_submitted_here(self, mock_submit):
+        """Queued jobs already in this process's pool are not submitted twice."""
+        job = QuizJob.objects.create(user=self.user, video_url="https://youtu.be/a")
+        self._age(job, 3600)
+        QuizJobQueue._submitted.add(job.pk)
+        self.addCleanup(QuizJobQueue._submitted.discard, job.pk)
+
+        self.assertEqual(QuizJobQueue.recover()["requeued"], 0)
+        mock_submit.assert_not_called()
+
+    @patch("quiz_app.services.jobs.QuizJobQueue.recover")
+    def test_job_polling_triggers_recovery_once_per_interval(self, mock_recover):
+        """Polling a job runs recovery, throttled per process."""
+        job = QuizJob.objects.create(user=self.user, video_url="https://youtu.be/a")
+        QuizJobQueue._last_recovery = 0.0
+
+        for _ in range(3):
+            self.assertEqual(self.client.get(f"/api/jobs/{job.pk}/").status_code, status.HTTP_200_OK)
+
+        mock_recover.assert_called_once()
+
+    def test_rejected_video_not_queued(self):
+        """Videos failing the pre-flight probe are rejected with 400."""
+        self.probe.side_effect = VideoRejectedError("Video ist zu lang (maximal 120 Minuten)")
+        response = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/huge"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("zu lang", response.data["error"])
+        self.assertFalse(QuizJob.objects.exists())
+
+    @override_settings(QUIZ_JOBS_MODE="eager")
+    @patch("quiz_app.services.quiz_creator.GeminiQuizService.generate_questions", return_value=fake_questions())
+    @patch("quiz_app.services.quiz_creator.TranscriptionService.transcribe", return_value="spoken words")
+    @patch("quiz_app.services.quiz_creator.YouTubeService.download_audio",
+           return_value=("a.m4a", {"title": "Traced", "duration": 300}))
+    def test_job_records_stage_metrics(self, mock_download, mock_transcribe, mock_generate):
+        """Finished jobs store per-stage timings and sizes, aggregated for admins."""
+        job_id = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/traced"}).data["id"]
+
+        metrics = QuizJob.objects.get(pk=job_id).metrics
+        self.assertEqual(set(metrics["stages"]), {"download", "transcription", "llm", "save"})
+        self.assertEqual(metrics["transcript_chars"], len("spoken words"))
+        self.assertEqual(metrics["transcript_cache"], "miss")
+
+        self.assertEqual(self.client.get("/api/metrics/pipeline/").status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        data = self.client.get("/api/metrics/pipeline/").data
+        self.assertEqual(data["jobs"], 1)
+        self.assertEqual(data["stages"]["transcription"]["count"], 1)
+        self.assertIn("scratch", data["process"])
+        self.assertIn("hit_rate", data["process"]["transcript_cache"])
+        self.assertIn("prompt_tokens_saved", data["process"]["quiz_assembly"])
+
+    @override_settings(QUIZ_JOBS_MODE="eager")
+    @patch("quiz_app.services.quiz_creator.TranscriptionService.transcribe", side_effect=RuntimeError("boom"))
+    @patch("quiz_app.services.quiz_creator.YouTubeService.download_audio", return_value=("a.m4a", {}))
+    def test_failed_job_names_failing_stage(self, mock_download, mock_transcribe):
+        """The error message and metrics say which stage failed."""
+        job_id = self.client.post("/api/createQuiz/", {"url": "https://youtu.be/broken"}).data["id"]
+
+        job = QuizJob.objects.get(pk=job_id)
+        self.assertEqual(job.error, "transcription: boom")
+        self.assertEqual(job.metrics["failed_stage"], "transcription")
+        self.assertNotIn("llm", job.metrics["stages"])
+
+    def test_job_detail_owner_only(self):
+        """Other users cannot read someone else's job."""
+        other = User.objects.create_user(username="other", password="pass123")
+        job = QuizJob.objects.create(user=other, video_url="https://youtu.be/abc")
+        response = self.client.get(f"/api/jobs/{job.id}/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(QUIZ_JOBS_MODE="db")
+class QuotaTests(TestCase):
+    """Test rate limits and active job caps on quiz creation."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="quotauser", password="pass123")
+        self.other = User.objects.create_user(username="otheruser", password="pass123")
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+        JobQuota.clear()
+        probe = patch("quiz_app.services.youtube.YouTubeService.probe", return_value={"duration": 300})
+        self.probe = probe.start()
+        self.addCleanup(probe.stop)
+
+    def create(self):
+        return self.client.post("/api/createQuiz/", {"url": "https://youtu.be/abc"})
+
+    @override_settings(QUIZ_THROTTLE_RATES={"quiz_create": "2/hour"}, QUIZ_THROTTLE_BURSTS={},
+                       QUIZ_MAX_ACTIVE_JOBS_PER_USER=0)
+    def test_token_bucket_limits_and_refills(self):
+        """Requests beyond the burst get 429 until a token has been refilled."""
+        self.assertEqual(self.create().status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.create().status_code, status.HTTP_202_ACCEPTED)
+
+        response = self.create()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(int(response["Retry-After"]), 1800)
+
+        with patch("quiz_app.api.throttling.time.time", return_value=time.time() + 1800):
+            self.assertEqual(self.create().status_code, status.HTTP_202_ACCEPTED)
+
+    @override_settings(QUIZ_MAX_ACTIVE_JOBS_PER_USER=2)
+    def test_per_user_active_job_cap(self):
+        """A user with too many pending jobs is refused before the video is probed."""
+        QuizJob.objects.create(user=self.user, video_url="https://youtu.be/a")
+        QuizJob.objects.create(user=self.user, video_url="https://youtu.be/b", status=QuizJob.Status.RUNNING)
+        self.probe.reset_mock()
+
+        response = self.create()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+        self.probe.assert_not_called()
+
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.create().status_code, status.HTTP_202_ACCEPTED)
+
+    @override_settings(QUIZ_MAX_ACTIVE_JOBS=2)
+    def test_global_backlog_sheds_load(self):
+        """Beyond the overall backlog new creations are shed for every user."""
+        QuizJob.objects.create(user=self.other, video_url="https://youtu.be/a")
+        QuizJob.objects.create(user=self.other, video_url="https://youtu.be/b")
+
+        response = self.create()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(JobQuota.stats()["rejected_backlog"], 1)
+
+    @override_settings(QUIZ_MAX_ACTIVE_JOBS_PER_USER=1)
+    def test_abandoned_and_finished_jobs_not_counted(self):
+        """Finished jobs and jobs without progress for too long do not block new ones."""
+        QuizJob.objects.create(user=self.user, video_url="https://youtu.be/a", status=QuizJob.Status.SUCCEEDED)
+        stale = QuizJob.objects.create(user=self.user, video_url="https://youtu.be/b")
+        QuizJob.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(self.create().status_code, status.HTTP_202_ACCEPTED)
+
+
+@override_settings(QUIZ_JOBS_MODE="db", QUIZ_MAX_ACTIVE_JOBS_PER_USER=2)
+class ConcurrentQuotaTests(TransactionTestCase):
+    """Test that simultaneous creations cannot overrun the active job cap."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="burstuser", password="pass123")
+        cache.clear()
+        JobQuota.clear()
+
+    def test_simultaneous_requests_respect_cap(self):
+        """Slots are reserved before the slow probe, so only the cap's worth of jobs is created."""
+        def slow_probe(*args, **kwargs):
+            time.sleep(0.2)
+            return {"duration": 300}
+
+        statuses = []
+
+        def post():
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            try:
+                statuses.append(client.post("/api/createQuiz/", {"url": "https://youtu.be/abc"}).status_code)
+            finally:
+                connection.close()
+
+        with patch("quiz_app.services.youtube.YouTubeService.probe", side_effect=slow_probe):
+            threads = [threading.Thread(target=post) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(statuses), [202] * 2 + [429] * 6)
+        self.assertEqual(QuizJob.objects.filter(user=self.user).count(), 2)
+
+    @patch("quiz_app.services.youtube.YouTubeService.probe", side_effect=VideoRejectedError("Video zu lang"))
+    def test_rejected_probe_releases_slot(self, mock_probe):
+        """A reservation whose video is rejected is removed again."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.post("/api/createQuiz/", {"url": "https://youtu.be/abc"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(QuizJob.objects.exists())
+
+
+@override_settings(WHISPER_CHUNK_MIN_SECONDS=0)
+class WhisperModelRegistryTests(TestCase):
+    """Test the process-wide Whisper model cache."""
+
+    def setUp(self):
+        WhisperModelRegistry.clear()
+        self.addCleanup(WhisperModelRegistry.clear)
+
+    @patch("whisper.load_model")
+    def test_model_loaded_once(self, mock_load):
+        """Repeated transcriptions reuse the loaded model."""
+        mock_load.return_value.transcribe.return_value = {"text": "hello"}
+
+        self.assertEqual(TranscriptionService.transcribe("a.mp3"), "hello")
+        self.assertEqual(TranscriptionService.transcribe("b.mp3"), "hello")
+
+        mock_load.assert_called_once()
+        stats = WhisperModelRegistry.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    @patch("whisper.load_model")
+    def test_inference_serialized_across_threads(self, mock_load):
+        """Two threads never decode on the shared model at the same time."""
+        active, overlaps = [0], []
+        counter_lock = threading.Lock()
+
+        def decode(audio):
+            with counter_lock:
+                active[0] += 1
+                overlaps.append(active[0])
+            time.sleep(0.05)
+            with counter_lock:
+                active[0] -= 1
+            return {"text": audio}
+
+        mock_load.return_value.transcribe.side_effect = decode
+        results = {}
+        threads = [threading.Thread(target=lambda n=n: results.update({n: TranscriptionService.transcribe(n)}))
+                   for n in ("a.mp3", "b.mp3")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {"a.mp3": "a.mp3", "b.mp3": "b.mp3"})
+        self.assertEqual(max(overlaps), 1)
+        mock_load.assert_called_once()
+
+    @patch("whisper.load_model")
+    def test_models_keyed_by_name_and_device(self, mock_load):
+        """Different model names or devices get separate cache entries."""
+        WhisperModelRegistry.get("tiny", "cpu")
+        WhisperModelRegistry.get("base", "cpu")
+        WhisperModelRegistry.get("tiny", "cpu")
+
+        self.assertEqual(mock_load.call_count, 2)
+        self.assertEqual(len(WhisperModelRegistry.stats()["loaded"]), 2)
+
+
+@override_settings(TRANSCRIPTION_WORKER_TIMEOUT_SECONDS=5)
+class TranscriptionWorkerTests(TestCase):
+    """Test offloading transcription to the standalone worker process."""
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        self.address = os.path.join(tmp, "whisper.sock")
+        self.worker = TranscriptionWorker(self.address)
+        threading.Thread(target=self.worker.serve_forever, daemon=True).start()
+        self.addCleanup(self.worker.close)
+
+    @patch("quiz_app.services.transcription.TranscriptionService.transcribe_local", return_value="remote text")
+    def test_transcription_routed_to_worker(self, mock_local):
+        """With a worker address configured, audio is transcribed by the worker."""
+        pcm = np.zeros(16000, dtype=np.float32)
+
+        with override_settings(TRANSCRIPTION_WORKER_ADDRESS=self.address):
+            self.assertTrue(TranscriptionWorkerClient.ping())
+            self.assertEqual(TranscriptionService.transcribe(pcm), "remote text")
+
+        np.testing.assert_array_equal(mock_local.call_args.args[0], pcm)
+        self.assertEqual(self.worker.stats()["served"], 1)
+
+    @patch("quiz_app.services.transcription.TranscriptionService.transcribe_local",
+           side_effect=FileNotFoundError("a.m4a"))
+    def test_worker_errors_raised_in_client(self, mock_local):
+        """Failures inside the worker surface as RuntimeError."""
+        with override_settings(TRANSCRIPTION_WORKER_ADDRESS=self.address):
+            with self.assertRaisesMessage(RuntimeError, "FileNotFoundError"):
+                TranscriptionService.transcribe("a.m4a")
+
+    def test_unreachable_worker_skipped(self):
+        """A dead address falls through to the next configured worker."""
+        dead = os.path.join(os.path.dirname(self.address), "missing.sock")
+
+        with override_settings(TRANSCRIPTION_WORKER_ADDRESS=f"{dead},{self.address}"):
+            self.assertTrue(TranscriptionWorkerClient.ping())
+            self.assertTrue(TranscriptionWorkerClient.ping())
+        with override_settings(TRANSCRIPTION_WORKER_ADDRESS=dead):
+            with self.assertRaisesMessage(RuntimeError, "Kein Transkriptions-Worker"):
+                TranscriptionService.transcribe("a.m4a")
+
+
+@patch("quiz_app.services.quiz_creator.GeminiQuizService.generate_questions",
+       return_value=fake_questions())
+@patch("quiz_app.services.quiz_creator.TranscriptionService.transcribe",
+       return_value="transcript text")
+@patch("quiz_app.services.quiz_creator.YouTubeService.download_audio",
+       return_value=("/tmp/audio.mp3", {"title": "Video Title"}))
+class TranscriptCacheTests(TestCase):
+    """Test reuse of transcripts across quiz creations of the same video."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="cacheuser", password="pass123")
+
+    def test_second_quiz_reuses_transcript(self, mock_download, mock_transcribe, mock_generate):
+        """The same video is downloaded and transcribed only once."""
+        QuizCreator.create(self.user, "https://youtu.be/abc123")
+        quiz = QuizCreator.create(self.user, "https://www.youtube.com/watch?v=abc123")
+
+        mock_download.assert_called_once()
+        mock_transcribe.assert_called_once()
+        self.assertEqual(mock_generate.call_args_list[1].args[0], "transcript text")
+        self.assertEqual(quiz.title, "Video Title")
+        self.assertEqual(Transcript.objects.get(video_id="abc123").hits, 1)
+
+    def test_eviction_keeps_most_recent(self, *mocks):
+        """Entries beyond the size limit are evicted least recently used first."""
+        with self.settings(TRANSCRIPT_CACHE_MAX_ENTRIES=2):
+            for video_id in ("one", "two", "three"):
+                TranscriptCache.store(video_id, "text", {"title": video_id})
+
+        self.assertEqual(
+            set(Transcript.objects.values_list("video_id", flat=True)), {"two", "three"})
+
+
+class SingleFlightTests(TestCase):
+    """Test coalescing of concurrent calls for the same key."""
+
+    def test_concurrent_callers_share_one_execution(self):
+        """Followers wait for the leader's result instead of running again."""
+        started, release = threading.Event(), threading.Event()
+        waiting = threading.Semaphore(0)
+        calls, results = [], []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "transcript"
+
+        def call():
+            results.append(SingleFlight.do("video:shared", work, on_wait=waiting.release))
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for t in threads[1:]:
+            t.start()
+        for _ in threads[1:]:
+            waiting.acquire(timeout=5)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["transcript"] * 4)
+
+    def test_leader_error_releases_key(self):
+        """An exception in the leader is raised and the next call runs again."""
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            SingleFlight.do("video:broken", fail)
+        self.assertEqual(SingleFlight.do("video:broken", lambda: "ok"), "ok")
+
+
+class YouTubeAudioModeTests(TestCase):
+    """Test how audio is fetched in the different YOUTUBE_AUDIO_MODE settings."""
+
+    def _mock_ydl(self, mock_ydl_cls, info):
+        ydl = MagicMock()
+        ydl.extract_info.return_value = info
+        mock_ydl_cls.return_value.__enter__.return_value = ydl
+        return ydl
+
+    @patch("quiz_app.services.youtube.os.path.exists", return_value=True)
+    @patch("yt_dlp.YoutubeDL")
+    def test_native_mode_skips_mp3_reencode(self, mock_ydl_cls, _exists):
+        """The native stream is downloaded without an FFmpeg postprocessor."""
+        self._mock_ydl(mock_ydl_cls, {"requested_downloads": [{"filepath": "/tmp/x.webm"}]})
+
+        with self.settings(YOUTUBE_AUDIO_MODE="native"):
+            path, _ = YouTubeService.download_audio("https://www.youtube.com/watch?v=abc")
+
+        self.assertEqual(path, "/tmp/x.webm")
+        self.assertNotIn("postprocessors", mock_ydl_cls.call_args.args[0])
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_probe_is_metadata_only_and_cached(self, mock_ydl_cls):
+        """The probe never downloads and is served from cache on repeat calls."""
+        cache.clear()
+        ydl = self._mock_ydl(mock_ydl_cls, {"title": "T", "duration": 600, "filesize": 5_000_000})
+
+        for _ in range(2):
+            meta = YouTubeService.probe("https://www.youtube.com/watch?v=abc", "abc")
+
+        ydl.extract_info.assert_called_once_with("https://www.youtube.com/watch?v=abc", download=False)
+        self.assertEqual(meta["duration"], 600)
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_probe_rejects_long_video(self, mock_ydl_cls):
+        """Videos over the duration limit raise before any download."""
+        cache.clear()
+        self._mock_ydl(mock_ydl_cls, {"title": "T", "duration": 4 * 3600})
+
+        with self.settings(YOUTUBE_MAX_DURATION_SECONDS=7200):
+            with self.assertRaises(VideoRejectedError):
+                YouTubeService.probe("https://www.youtube.com/watch?v=long", "long")
+
+    @patch("quiz_app.services.audio.subprocess.run")
+    @patch("yt_dlp.YoutubeDL")
+    def test_stream_mode_decodes_without_download(self, mock_ydl_cls, mock_run):
+        """Stream mode only extracts metadata and pipes the stream URL into ffmpeg."""
+        ydl = self._mock_ydl(mock_ydl_cls, {
+            "url": "https://media.example/audio", "http_headers": {"User-Agent": "x"}})
+        mock_run.return_value.stdout = b"\x00\x40" * 4
+
+        pcm, _ = YouTubeService.stream_audio("https://www.youtube.com/watch?v=abc")
+
+        ydl.extract_info.assert_called_once_with("https://www.youtube.com/watch?v=abc", download=False)
+        cmd = mock_run.call_args.args[0]
+        self.assertIn("https://media.example/audio", cmd)
+        self.assertEqual(cmd[cmd.index("-ar") + 1], "16000")
+        self.assertEqual(len(pcm), 4)
+        self.assertAlmostEqual(float(pcm[0]), 0.5)
+
+    @patch("quiz_app.services.audio.decode_audio")
+    @patch("yt_dlp.YoutubeDL")
+    def test_stage_times_do_not_overlap(self, mock_ydl_cls, mock_decode):
+        """Nested stages (decode, model_load) are not counted twice in a traced run."""
+        self._mock_ydl(mock_ydl_cls, {"url": "https://media.example/audio", "title": "T"})
+
+        def decode(*args, **kwargs):
+            time.sleep(0.05)
+            return np.zeros(16000, dtype=np.float32)
+
+        def transcribe(audio):
+            with tracing.stage("model_load"):
+                time.sleep(0.05)
+            time.sleep(0.02)
+            return "spoken words"
+
+        mock_decode.side_effect = decode
+        with self.settings(YOUTUBE_AUDIO_MODE="stream"), \
+                patch("quiz_app.services.quiz_creator.TranscriptionService.transcribe", side_effect=transcribe), \
+                tracing.trace() as pipeline:
+            QuizCreator._download_and_transcribe("https://www.youtube.com/watch?v=abc", lambda *args: None)
+            wall = time.perf_counter() - pipeline.started
+
+        self.assertEqual(set(pipeline.stages), {"download", "decode", "transcription", "model_load"})
+        self.assertGreaterEqual(pipeline.stages["decode"], 0.05)
+        self.assertLess(pipeline.stages["download"], 0.05)
+        self.assertLess(pipeline.stages["transcription"], 0.05)
+        self.assertLessEqual(sum(pipeline.stages.values()), wall)
+
+
+class ScratchSpaceTests(TestCase):
+    """Test per-job download directories, cleanup, quota and reaping."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        scratch = override_settings(SCRATCH_DIR=self.root, SCRATCH_QUOTA_BYTES=1000)
+        scratch.enable()
+        self.addCleanup(scratch.disable)
+        cache.clear()
+        # Never let the reaper near the real system temp dir.
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        gettempdir = patch("quiz_app.services.scratch.tempfile.gettempdir", return_value=self.tmp)
+        gettempdir.start()
+        self.addCleanup(gettempdir.stop)
+
+    def _write(self, path, size):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+
+    @patch("quiz_app.services.quiz_creator.TranscriptionService.transcribe", side_effect=RuntimeError("boom"))
+    @patch("quiz_app.services.quiz_creator.YouTubeService.download_audio")
+    def test_download_removed_when_transcription_fails(self, mock_download, mock_transcribe):
+        """The job directory is deleted even if the pipeline fails after downloading."""
+        def download(url, workdir):
+            path = os.path.join(workdir, "audio.m4a")
+            self._write(path, 100)
+            return path, {"title": "T"}
+        mock_download.side_effect = download
+
+        with self.assertRaises(RuntimeError):
+            QuizCreator._download_and_transcribe("https://www.youtube.com/watch?v=abc", lambda *a: None)
+
+        self.assertEqual(os.listdir(self.root), [])
+        stats = ScratchSpace.stats()
+        self.assertEqual(stats["active_dirs"], 0)
+        self.assertEqual(stats["bytes_in_flight"], 0)
+
+    @patch("quiz_app.services.youtube.YouTubeService.probe", return_value={"duration": 60, "filesize": 600})
+    def test_quota_rejects_new_jobs_with_503(self, mock_probe):
+        """While downloads in flight fill the quota, new jobs are refused with Retry-After."""
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username="scratch", password="pass123"))
+
+        with ScratchSpace.job() as workdir:
+            self._write(os.path.join(workdir, "other.m4a"), 500)
+            response = client.post("/api/createQuiz/", {"url": "https://youtu.be/abc"})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "30")
+        self.assertFalse(QuizJob.objects.exists())
+
+    def test_reaper_removes_only_stale_entries(self):
+        """Old leftovers are deleted; recent and in-use directories are kept."""
+        stale = os.path.join(self.root, "job-stale")
+        os.makedirs(stale)
+        self._write(os.path.join(stale, "audio.m4a"), 50)
+        os.utime(os.path.join(stale, "audio.m4a"), (0, 0))
+        os.utime(stale, (0, 0))
+        fresh = os.path.join(self.root, "job-fresh")
+        os.makedirs(fresh)
+
+        legacy = os.path.join(self.tmp, "0b1e4a8e-6c1f-4a55-9d2e-1f6f0c3a7b9d.m4a")
+        self._write(legacy, 10)
+        os.utime(legacy, (0, 0))
+
+        with ScratchSpace.job() as active:
+            os.utime(active, (0, 0))
+            out = StringIO()
+            call_command("reap_scratch", "--max-age", "60", stdout=out)
+            self.assertTrue(os.path.isdir(active))
+
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.isdir(fresh))
+        self.assertTrue(os.path.exists(legacy))
+        self.assertIn("Removed 1 entries", out.getvalue())
+
+    def test_reaper_legacy_sweep_is_opt_in(self):
+        """Only with --legacy-temp-files are stale <uuid>.<ext> files in the temp dir removed."""
+        legacy = os.path.join(self.tmp, "0b1e4a8e-6c1f-4a55-9d2e-1f6f0c3a7b9d.m4a")
+        other = os.path.join(self.tmp, "notes.m4a")
+        for path in (legacy, other):
+            self._write(path, 10)
+            os.utime(path, (0, 0))
+
+        call_command("reap_scratch", "--max-age", "60", "--legacy-temp-files", stdout=StringIO())
+
+        self.assertFalse(os.path.exists(legacy))
+        self.assertTrue(os.path.exists(other))
+
+
+class ChunkedTranscriptionTests(TestCase):
+    """Test splitting long audio into chunks and stitching the text back."""
+
+    def test_split_covers_audio_with_overlap(self):
+        """Spans cover the whole signal in order and overlap by the configured amount."""
+        pcm = np.random.default_rng(0).uniform(-0.5, 0.5, 16000 * 65).astype(np.float32)
+        spans = split_audio(pcm, window_seconds=20, overlap_seconds=1)
+
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(spans[-1][1], len(pcm))
+        for (_, prev_end), (next_start, _) in zip(spans, spans[1:]):
+            self.assertEqual(prev_end - next_start, 16000)
+
+    def test_split_cuts_at_silence(self):
+        """A quiet stretch near the window boundary becomes the cut point."""
+        pcm = np.full(16000 * 30, 0.5, dtype=np.float32)
+        pcm[16000 * 19:16000 * 19 + 3200] = 0.0
+        start, end = split_audio(pcm, window_seconds=20, overlap_seconds=1)[0]
+
+        self.assertGreaterEqual(end, 16000 * 19)
+        self.assertLess(end, 16000 * 19 + 3200)
+
+    def test_stitch_removes_boundary_duplicates(self):
+        """Words transcribed twice in the overlap appear once."""
+        text = stitch_texts([
+            "Today we talk about the mitochondria.",
+            "about the Mitochondria, the powerhouse of the cell.",
+        ])
+        self.assertEqual(text, "Today we talk about the mitochondria. the powerhouse of the cell.")
+
+    @override_settings(WHISPER_CHUNK_SECONDS=10, WHISPER_CHUNK_OVERLAP_SECONDS=1)
+    @patch("quiz_app.services.chunked_transcription._transcribe_chunk")
+    def test_serial_fallback_keeps_chunk_order(self, mock_chunk):
+        """With one worker chunks are transcribed in-process and joined in order."""
+        pcm = np.zeros(16000 * 25, dtype=np.float32)
+        chunk_count = len(split_audio(pcm, 10, 1))
+        mock_chunk.side_effect = [f"part{i}" for i in range(chunk_count)]
+
+        self.assertGreater(chunk_count, 2)
+        self.assertEqual(
+            ChunkedTranscriber.transcribe(pcm, workers=1),
+            " ".join(f"part{i}" for i in range(chunk_count)))
+
+    @override_settings(WHISPER_CHUNK_SECONDS=10, WHISPER_CHUNK_OVERLAP_SECONDS=1, WHISPER_CHUNK_WORKERS=4)
+    @patch("quiz_app.services.chunked_transcription.ProcessPoolExecutor",
+           side_effect=lambda max_workers, **kwargs: ThreadPoolExecutor(max_workers))
+    @patch("quiz_app.services.chunked_transcription._transcribe_chunk", side_effect=lambda job: str(len(job[0])))
+    def test_pool_created_once_for_different_chunk_counts(self, mock_chunk, mock_pool):
+        """Audio of different lengths shares one pool sized by the worker setting."""
+        ChunkedTranscriber._reset_pool()
+        self.addCleanup(ChunkedTranscriber._reset_pool)
+
+        chunks = 0
+        for seconds in (25, 70, 25):
+            pcm = np.zeros(16000 * seconds, dtype=np.float32)
+            ChunkedTranscriber.transcribe(pcm)
+            chunks += len(split_audio(pcm, 10, 1))
+
+        self.assertEqual(mock_chunk.call_count, chunks)
+        mock_pool.assert_called_once()
+        self.assertEqual(mock_pool.call_args.kwargs["max_workers"], 4)
+
+
+class QuestionValidationTests(TestCase):
+    """Test per-question validation of LLM output."""
+
+    def test_valid_questions_keeps_good_items(self):
+        """Invalid items and repeated titles are dropped, valid ones kept in order."""
+        good = fake_questions(3)
+        data = [good[0], {"question_title": "No answer?", "question_options": ["A", "B", "C", "D"]},
+                good[1], dict(good[0]), "not a dict", good[2]]
+        self.assertEqual(valid_questions(data), good)
+        self.assertEqual(valid_questions({"not": "a list"}), [])
+
+
+class JsonArrayParsingTests(TestCase):
+    """Test incremental parsing of JSON arrays in LLM output."""
+
+    def test_ignores_text_and_brackets_around_array(self):
+        """Prose and stray brackets after the array do not break parsing."""
+        text = 'Here you go: [{"a": 1}, {"b": [2, 3]}] (see [1] for details]'
+        self.assertEqual(list(iter_json_array_items(text)), [{"a": 1}, {"b": [2, 3]}])
+
+    def test_truncated_output_keeps_complete_items(self):
+        """Items before a truncated tail are still returned."""
+        text = '[{"a": 1}, {"b": 2}, {"c": '
+        self.assertEqual(list(iter_json_array_items(text)), [{"a": 1}, {"b": 2}])
+
+    def test_no_array(self):
+        """Text without an array yields nothing."""
+        self.assertEqual(list(iter_json_array_items("no json here")), [])
+
+
+class TranscriptCondensationTests(TestCase):
+    """Test shrinking long transcripts to the prompt token budget."""
+
+    def test_short_transcript_unchanged(self):
+        """Transcripts within budget are passed through untouched."""
+        text = "Photosynthesis converts light into chemical energy."
+        self.assertEqual(condense_transcript(text, 1000), text)
+
+    def test_long_transcript_fits_budget_and_covers_video(self):
+        """Condensed text stays in budget, keeps order and draws from start to end."""
+        sentences = [f"Sentence {i} explains topic number {i} in detail." for i in range(500)]
+        condensed = condense_transcript(" ".join(sentences), 800)
+
+        self.assertLessEqual(estimate_tokens(condensed), 800)
+        kept = [int(s.split()[1]) for s in condensed.split(". ") if s.startswith("Sentence")]
+        self.assertEqual(kept, sorted(kept))
+        self.assertLess(kept[0], 50)
+        self.assertGreater(kept[-1], 450)
+
+    def test_unpunctuated_transcript_truncated_per_segment(self):
+        """Chunks larger than a segment's allowance are cut down instead of dropped."""
+        words = [f"word{i}" for i in range(6000)]
+        condensed = condense_transcript(" ".join(words), 500)
+
+        self.assertLessEqual(estimate_tokens(condensed), 500)
+        kept = [int(w[4:]) for w in condensed.split()]
+        self.assertEqual(kept, sorted(kept))
+        self.assertLess(kept[0], 600)
+        self.assertGreater(kept[-1], 5400)
+
+
+class QuizPersistenceTests(TestCase):
+    """Test that generated questions are stored in a single round of writes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="saveuser", password="pass123")
+
+    def test_save_quiz_query_count(self):
+        """The quiz and its questions are written with one INSERT each."""
+        # SAVEPOINT, INSERT quiz, INSERT questions, RELEASE SAVEPOINT
+        with self.assertNumQueries(4):
+            quiz, questions = QuizCreator._save_quiz(
+                self.user, "https://youtu.be/abc", fake_questions(), {"title": "Final Title"})
+
+        with self.assertNumQueries(0):
+            data = QuizReadSerializer.one(quiz, questions)
+
+        self.assertEqual(data["title"], "Final Title")
+        self.assertEqual(len(data["questions"]), 10)
+        self.assertTrue(all(q["id"] for q in data["questions"]))
+        self.assertEqual(Question.objects.filter(quiz=quiz).count(), 10)
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(QuizSerializer(quiz).data))
+
+
+@override_settings(LLM_MAX_ATTEMPTS=3, QUIZ_LLM_BACKENDS=["gemini"])
+@patch("quiz_app.services.gemini.time.sleep")
+@patch("quiz_app.services.llm_backends._client")
+class GeminiResilienceTests(TestCase):
+    """Test retries, error classification and the circuit breaker for Gemini calls."""
+
+    def setUp(self):
+        reset_backends()
+        self.addCleanup(reset_backends)
+
+    def _response(self, payload):
+        return MagicMock(text=json.dumps(payload))
+
+    def _error(self, code):
+        body = {"error": {"code": code, "message": "x", "status": "X"}}
+        return (genai_errors.ServerError if code >= 500 else genai_errors.ClientError)(code, body)
+
+    def test_transient_errors_retried_with_backoff(self, mock_client, mock_sleep):
+        """503s and invalid output are retried, waiting between attempts."""
+        mock_client.models.generate_content.side_effect = [
+            self._error(503), self._response([{"broken": True}]), self._response(fake_questions())]
+
+        self.assertEqual(len(GeminiQuizService.generate_questions("transcript")), 10)
+        self.assertEqual(mock_client.models.generate_content.call_count, 3)
+        self.assertEqual(mock_sleep.call_args_list[0].args[0], 0.0)
+        self.assertEqual(
+            get_backend("gemini").metrics.snapshot()["outcomes"], {"ServerError": 1, "invalid": 1, "ok": 1})
+
+    def test_partial_response_salvaged_with_followup(self, mock_client, mock_sleep):
+        """Valid questions are kept and only the missing ones are requested again."""
+        first = fake_questions(7) + [{"question_title": "Bad?", "question_options": ["A", "A", "B", "C"], "answer": "A"}]
+        followup = [dict(q, question_title=f"Extra {i}?") for i, q in enumerate(fake_questions(3))]
+        mock_client.models.generate_content.side_effect = [
+            self._response(first), self._response(followup)]
+        saved_before = QuizAssembly.stats()["prompt_tokens_saved"]
+
+        questions = GeminiQuizService.generate_questions("Some transcript. " * 200)
+
+        self.assertEqual(len(questions), 10)
+        self.assertEqual(questions[-1]["question_title"], "Extra 2?")
+        prompts = [c.kwargs["contents"] for c in mock_client.models.generate_content.call_args_list]
+        self.assertIn("EXACTLY 3 additional", prompts[1])
+        self.assertIn("Question 6?", prompts[1])
+        self.assertLess(len(prompts[1]), len(prompts[0]))
+        self.assertGreater(QuizAssembly.stats()["prompt_tokens_saved"], saved_before)
+
+    def test_structured_output_requested(self, mock_client, mock_sleep):
+        """Calls ask for schema-constrained JSON output."""
+        mock_client.models.generate_content.return_value = self._response(fake_questions())
+
+        GeminiQuizService.generate_questions("transcript")
+
+        config = mock_client.models.generate_content.call_args.kwargs["config"]
+        self.assertEqual(config.response_mime_type, "application/json")
+        self.assertEqual(
+            config.response_schema.items.required, ["question_title", "question_options", "answer"])
+
+    def test_fatal_error_not_retried(self, mock_client, mock_sleep):
+        """Client errors such as 400 fail immediately."""
+        mock_client.models.generate_content.side_effect = self._error(400)
+
+        with self.assertRaises(RuntimeError):
+            GeminiQuizService.generate_questions("transcript")
+        mock_client.models.generate_content.assert_called_once()
+
+    @override_settings(LLM_MAX_ATTEMPTS=10)
+    def test_circuit_opens_and_fails_fast(self, mock_client, mock_sleep):
+        """After repeated upstream failures calls fail without reaching Gemini."""
+        mock_client.models.generate_content.side_effect = self._error(503)
+        threshold = get_backend("gemini").breaker.failure_threshold
+
+        with self.assertRaises(CircuitOpenError):
+            GeminiQuizService.generate_questions("transcript")
+        self.assertEqual(mock_client.models.generate_content.call_count, threshold)
+
+        with self.assertRaises(CircuitOpenError):
+            GeminiQuizService.generate_questions("transcript")
+        self.assertEqual(mock_client.models.generate_content.call_count, threshold)
+
+    @override_settings(QUIZ_LLM_BACKENDS=["gemini", "fake"])
+    def test_failover_to_next_backend(self, mock_client, mock_sleep):
+        """A failing backend hands the attempt over to the next configured one."""
+        mock_client.models.generate_content.side_effect = self._error(503)
+
+        questions = GeminiQuizService.generate_questions("One fact. Another fact. A third. And more.")
+
+        self.assertEqual(len(questions), 10)
+        mock_client.models.generate_content.assert_called_once()
+        self.assertEqual(get_backend("fake").metrics.snapshot()["outcomes"], {"ok": 1})
+
+    @override_settings(QUIZ_LLM_BACKENDS=["gemini", "fake"], QUIZ_LLM_LONG_PROMPT_BACKEND="fake",
+                       QUIZ_LLM_LONG_PROMPT_TOKENS=50)
+    def test_long_transcripts_routed_to_long_prompt_backend(self, mock_client, mock_sleep):
+        """Short transcripts use the default order, long ones the long-prompt backend."""
+        self.assertEqual([b.name for b in select_backends("Short.")], ["gemini", "fake"])
+        self.assertEqual([b.name for b in select_backends("A long sentence here. " * 50)], ["fake", "gemini"])
+
+    @override_settings(QUIZ_LLM_BACKENDS=["gemini"], QUIZ_LLM_LONG_PROMPT_BACKEND="fake",
+                       QUIZ_LLM_LONG_PROMPT_TOKENS=500, QUIZ_TRANSCRIPT_TOKEN_BUDGET=200)
+    def test_routing_uses_raw_transcript_length(self, mock_client, mock_sleep):
+        """Transcripts longer than the routing limit go to the long-prompt backend even after condensing."""
+        questions = GeminiQuizService.generate_questions("A long sentence about cells here. " * 200)
+
+        self.assertEqual(len(questions), 10)
+        mock_client.models.generate_content.assert_not_called()
+
+    @override_settings(QUIZ_LLM_BACKENDS=[])
+    def test_empty_backend_list_rejected(self, mock_client, mock_sleep):
+        """Without any configured backend the error names the setting."""
+        with self.assertRaisesMessage(ImproperlyConfigured, "QUIZ_LLM_BACKENDS"):
+            GeminiQuizService.generate_questions("transcript")
+
+    @override_settings(QUIZ_LLM_BACKENDS=["gemini"], QUIZ_LLM_LONG_PROMPT_BACKEND="fake",
+                       QUIZ_LLM_LONG_PROMPT_TOKENS=50, QUIZ_LLM_SLOW_P95_MS=1000)
+    def test_failover_includes_long_prompt_backend(self, mock_client, mock_sleep):
+        """A fatal error hands over to the long-prompt backend even if it is not in QUIZ_LLM_BACKENDS."""
+        for _ in range(5):
+            get_backend("fake").metrics.record("ok", 5.0)  # demoted behind gemini
+        mock_client.models.generate_content.side_effect = self._error(400)
+
+        questions = GeminiQuizService.generate_questions("A long sentence here. " * 50)
+
+        self.assertEqual(len(questions), 10)
+        mock_client.models.generate_content.assert_called_once()
+
+    @override_settings(QUIZ_LLM_BACKENDS=["gemini", "fake"], QUIZ_LLM_SLOW_P95_MS=1000)
+    def test_slow_backend_tried_last(self, mock_client, mock_sleep):
+        """A backend whose p95 latency exceeds the limit is moved behind the others."""
+        for _ in range(5):
+            get_backend("gemini").metrics.record("ok", 5.0)
+        self.assertEqual([b.name for b in select_backends("Short.")], ["fake", "gemini"])
+
+
+class CircuitBreakerTests(TestCase):
+    """Test the half-open state of the circuit breaker."""
+
+    def test_half_open_lets_one_probe_through(self):
+        """After the cool-down only one of two concurrent callers reaches the dependency."""
+        breaker = CircuitBreaker("llm", failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        barrier, outcomes = threading.Barrier(2), []
+
+        def call():
+            barrier.wait()
+            try:
+                breaker.before_call()
+                outcomes.append("probe")
+            except CircuitOpenError:
+                outcomes.append("rejected")
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ["probe", "rejected"])
+        breaker.record_success()
+        breaker.before_call()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_failed_probe_reopens(self):
+        """A failing probe opens the circuit again for the full cool-down."""
+        breaker = CircuitBreaker("llm", failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+
+class FakeBackendTests(TestCase):
+    """Test the deterministic offline LLM backend."""
+
+    def test_generates_valid_questions_offline(self):
+        """The fake backend answers a real prompt with a valid, repeatable quiz."""
+        prompt = build_quiz_prompt("The sun is a star. Water boils at 100 degrees. Cats purr. Rust oxidizes.")
+
+        first = FakeBackend().generate(prompt)
+        questions = json.loads(first)
+
+        self.assertEqual(len(valid_questions(questions)), 10)
+        self.assertEqual(first, FakeBackend().generate(prompt))
+
+    @override_settings(QUIZ_LLM_BACKENDS=["fake"])
+    def test_full_generation_without_network(self):
+        """The whole generation loop runs against the fake backend."""
+        reset_backends()
+        self.addCleanup(reset_backends)
+
+        questions = GeminiQuizService.generate_questions("Only one sentence in this transcript.")
+
+        self.assertEqual(len(questions), 10)
+
+
+class AsyncCreateQuizTests(TestCase):
+    """Test the ASGI-native create endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="asyncuser", password="pass123")
+        reset_backends()
+        cache.clear()
+
+    @patch("quiz_app.services.llm_backends._client")
+    @patch("quiz_app.services.quiz_creator.QuizCreator._load_transcript",
+           return_value=("transcript text", {"title": "Async Quiz"}))
+    @patch("quiz_app.services.quiz_creator.QuizCreator.preflight")
+    async def test_async_create_returns_quiz(self, mock_preflight, mock_load, mock_client):
+        """The pipeline is awaited and the finished quiz returned with 201."""
+        mock_client.aio.models.generate_content = AsyncMock(
+            return_value=MagicMock(text=json.dumps(fake_questions())))
+        self.async_client.cookies["access_token"] = str(AccessToken.for_user(self.user))
+
+        response = await self.async_client.post(
+            "/api/createQuiz/async/", {"url": "https://youtu.be/abc"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.json()
+        self.assertEqual(data["title"], "Async Quiz")
+        self.assertEqual(len(data["questions"]), 10)
+        self.assertIn("llm;dur=", response["Server-Timing"])
+        mock_client.models.generate_content.assert_not_called()
+
+    @patch("quiz_app.services.quiz_creator.QuizCreator.preflight", return_value={"video_id": "abc"})
+    async def test_preflight_not_queued_behind_transcriptions(self, mock_preflight):
+        """apreflight answers while every offload worker is busy transcribing."""
+        busy = ThreadPoolExecutor(max_workers=1)
+        release = threading.Event()
+        busy.submit(release.wait)
+        self.addCleanup(busy.shutdown)
+        self.addCleanup(release.set)
+
+        with patch.object(QuizCreator, "_get_offload_executor", return_value=busy):
+            meta = await asyncio.wait_for(QuizCreator.apreflight("https://youtu.be/abc"), timeout=5)
+
+        self.assertEqual(meta, {"video_id": "abc"})
+
+    async def test_async_create_respects_job_quota(self):
+        """Inline creations count as active jobs; over the cap the request gets 429."""
+        self.async_client.cookies["access_token"] = str(AccessToken.for_user(self.user))
+        await sync_to_async(JobQuota.admit)(self.user, inline=True)
+        self.addCleanup(JobQuota.clear)
+
+        with self.settings(QUIZ_MAX_ACTIVE_JOBS_PER_USER=1):
+            response = await self.async_client.post(
+                "/api/createQuiz/async/", {"url": "https://youtu.be/abc"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+
+    async def test_async_create_requires_authentication(self):
+        """Anonymous requests are rejected."""
+        response = await self.async_client.post(
+            "/api/createQuiz/async/", {"url": "https://youtu.be/abc"}, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)